@@ -0,0 +1,28 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+# Streams whose events must reach the client as they are sent
+UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream",)
+
+class StreamingGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message):
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if content_type.startswith(UNCOMPRESSED_CONTENT_TYPES):
+                # zlib would hold each small event in its buffer until the
+                # stream closes; pass the response through as is
+                await self.send(message)
+                self.started = True
+                self.content_encoding_set = True
+                return
+        await super().send_with_gzip(message)
+
+class StreamingGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves server-sent event streams uncompressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = StreamingGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
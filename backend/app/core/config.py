@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,8 +7,99 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    password_hash_workers: int = 0  # bcrypt threads; 0 = one per CPU core
+    password_hash_max_pending: int = 64  # hash/verify calls allowed to wait for a thread
+    user_cache_ttl_seconds: int = 60
+    token_cache_enabled: bool = True
+    token_cache_max_entries: int = 10000
+    token_cache_ttl_seconds: int = 300  # never longer than the token's own exp
+    user_cache_max_entries: int = 10000
     mongodb_url: str
     mongodb_name: str = "document_processor"
+
+    # Document storage: "local" (sharded directories) or "s3" (needs boto3)
+    storage_backend: str = "local"
+    temp_storage_path: str = "temp_storage"
+    s3_bucket: str = ""
+    s3_prefix: str = "documents/"
+    s3_endpoint_url: Optional[str] = None  # e.g. a MinIO endpoint
+
+    # Uploads
+    max_upload_size: int = 100 * 1024 * 1024
+    upload_chunk_size: int = 1024 * 1024
+    max_batch_files: int = 500  # files per batch request or archive
+    classifier_header_bytes: int = 8192  # prefix inspected by libmagic
+
+    # Background processing (see app/processing/worker.py)
+    worker_processes: int = 0  # 0 = one worker process per CPU core
+    job_lease_seconds: int = 300
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 10.0
+    job_retry_backoff_max_seconds: float = 600.0
+    job_poll_interval_seconds: float = 1.0
+    job_retention_seconds: int = 7 * 24 * 3600  # finished jobs are deleted this long after finishing
+    worker_metrics_port: int = 0  # worker N serves /metrics on this port + N; 0 = off
+
+    # Metrics (GET /metrics on the API)
+    metrics_enabled: bool = True
+    event_loop_lag_interval_seconds: float = 0.5
+    queue_metrics_interval_seconds: float = 15.0  # how often queue depth is read from MongoDB
+    queue_metrics_timeout_seconds: float = 2.0
+
+    ocr_dpi: int = 300
+    ocr_language: str = "eng"
+    ocr_engine: str = "tesserocr"  # falls back to "pytesseract" if tesserocr is not installed
+
+    # Progress reporting: coalesce page progress writes to one per N pages or T ms
+    progress_flush_pages: int = 5
+    progress_flush_interval_ms: int = 1000
+    progress_stream_poll_seconds: float = 1.0
+
+    # Page-parallel PDF OCR. Worker processes share one budget of
+    # CPU cores / ocr_tesseract_threads concurrent Tesseract runs, so a large
+    # scan on an idle host fans out over every core.
+    ocr_workers: int = 0  # page processes per worker process; 0 = the whole core budget
+    ocr_tesseract_threads: int = 1  # OMP_THREAD_LIMIT for each Tesseract run
+    ocr_max_pages_in_flight: int = 0  # 0 = twice the number of OCR workers
+    ocr_parallel_min_pages: int = 2  # smaller PDFs are OCRed inline
+    ocr_render_window: int = 1  # PDF pages rasterized per pdftoppm call
+
+    # Page preprocessing before OCR (see app/processing/preprocess.py)
+    ocr_dpi_mode: str = "fixed"  # "auto" picks each page's DPI from a quick text-height probe
+    ocr_min_dpi: int = 150  # auto DPI stays between ocr_min_dpi and ocr_dpi
+    ocr_target_line_height: int = 40  # text line height in pixels auto DPI aims for
+    ocr_max_page_pixels: int = 2480 * 3508  # auto DPI caps oversized pages at A4 300 DPI
+    ocr_color_mode: str = "color"  # "color", "grayscale" or "binary" (Otsu threshold)
+    ocr_deskew: bool = False
+    ocr_deskew_max_angle: float = 5.0
+    ocr_crop_margins: bool = False
+
+    # PDF pages with an embedded text layer skip rasterization and OCR
+    text_layer_enabled: bool = True
+    text_layer_min_chars: int = 16  # fewer non-blank characters and the page is OCRed
+
+    # Typed dates and amounts (see app/processing/typed_fields.py)
+    date_order: str = "MDY"  # how 03/04/2024 is read: "MDY" (March 4) or "DMY" (3 April)
+    default_currency: str = "USD"  # currency of extracted "$" amounts
+
+    # Near-duplicate pages (see app/processing/duplicates.py)
+    duplicate_detection_enabled: bool = False
+    duplicate_hash_threshold: int = 12  # max differing bits of two 256-bit page hashes
+    duplicate_hash_bands: int = 13  # lookup bands; must exceed the threshold
+    duplicate_max_candidates: int = 200  # stored pages compared per lookup
+    # Reusing text is only safe for true rescans; forms filled from one template
+    # hash alike, so by default near-duplicates are only flagged
+    duplicate_reuse_ocr: bool = False
+
+    # Search (see app/processing/search.py)
+    search_language: str = "english"  # stemming and stop words of the text index
+    search_snippet_chars: int = 160
+    search_max_field_matches: int = 10000  # documents a field filter may narrow a text search to
+
+    # Content-addressed OCR result cache
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: int = 30 * 24 * 3600
+    result_cache_memory_entries: int = 256  # in-process LRU in front of MongoDB; 0 disables it
     
     class Config:
         env_file = ".env"
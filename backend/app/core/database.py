@@ -7,11 +7,24 @@
 # def get_database() -> AsyncIOMotorClient:
 #     return db
 
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import MongoClient
+from pymongo.database import Database
 from app.core.config import settings
 
 client = AsyncIOMotorClient(settings.mongodb_url)
 db = client[settings.mongodb_name]
 
+# Synchronous client for worker processes. Created lazily so that every
+# process gets its own connection pool (pymongo clients are not fork-safe).
+_sync_client: Optional[MongoClient] = None
+
 def get_database() -> AsyncIOMotorDatabase:
     return db
+
+def get_sync_database() -> Database:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(settings.mongodb_url)
+    return _sync_client[settings.mongodb_name]
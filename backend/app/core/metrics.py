@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict
+from app.models.job import JobStatus
+from app.processing.jobs import JOBS_COLLECTION
+from app.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Processing pipeline, recorded by whichever process runs the stage
+STAGE_SECONDS = REGISTRY.histogram(
+    "document_stage_seconds",
+    "Time spent in each processing stage; rasterize, ocr and extract are per page",
+    ["stage"]
+)
+PAGES_TOTAL = REGISTRY.counter(
+    "document_pages_total", "Pages processed, by where their text came from", ["source"]
+)
+JOBS_TOTAL = REGISTRY.counter("worker_jobs_total", "Jobs finished by this process, by outcome", ["outcome"])
+JOBS_IN_FLIGHT = REGISTRY.gauge("worker_jobs_in_flight", "Jobs this process is working on")
+
+# Queue state, refreshed from MongoDB in the background (see monitor_queue)
+QUEUE_DEPTH = REGISTRY.gauge("job_queue_jobs", "Jobs in the processing queue by status", ["status"])
+
+# API
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "event_loop_lag_seconds", "How late the event loop last woke a sleeping task"
+)
+
+_caches: Dict[str, Callable[[], Dict]] = {}
+
+def watch_cache(name: str, stats: Callable[[], Dict]):
+    """Export a cache's stats() (hits, misses, hit_rate) under the label cache=name"""
+    _caches[name] = stats
+
+def _cache_values(field: str) -> Callable[[], Dict]:
+    def values():
+        result = {}
+        for name, stats in _caches.items():
+            current = stats()
+            if field == "hits" and "hits" not in current:
+                # The result cache counts memory and database hits separately
+                result[(name,)] = current.get("memory_hits", 0) + current.get("db_hits", 0)
+            else:
+                result[(name,)] = current.get(field, 0)
+        return result
+    return values
+
+REGISTRY.counter("cache_hits_total", "Cache hits since the process started", ["cache"], _cache_values("hits"))
+REGISTRY.counter("cache_misses_total", "Cache misses since the process started", ["cache"],
+                 _cache_values("misses"))
+REGISTRY.gauge("cache_hit_ratio", "Cache hits per lookup since the process started", ["cache"],
+               _cache_values("hit_rate"))
+
+async def update_queue_metrics(db, timeout: float):
+    """Count queued, running and failed jobs (index-only counts on status)"""
+    for status in (JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.FAILED):
+        count = await db[JOBS_COLLECTION].count_documents(
+            {"status": status.value}, maxTimeMS=int(timeout * 1000)
+        )
+        QUEUE_DEPTH.set(count, status=status.value)
+
+async def monitor_queue(db, interval: float, timeout: float):
+    """Refresh the queue depth gauges every interval seconds.
+
+    Scrapes only read the last values, so a slow or unreachable MongoDB
+    never holds up /metrics; the gauges just go stale until it is back.
+    """
+    while True:
+        try:
+            # maxTimeMS does not cover waiting for a server to become selectable
+            await asyncio.wait_for(update_queue_metrics(db, timeout), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading queue metrics: {e!r}")
+        await asyncio.sleep(interval)
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Sleep in a loop and record how much later than asked each wake-up is.
+
+    Anything blocking the loop (sync I/O, CPU work in a handler) shows up
+    as lag, since this task cannot run until it yields.
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(time.perf_counter() - start - interval, 0.0))
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template.
+
+    Routes are labelled by their path template (/api/documents/{document_id}),
+    never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code)
+            )
@@ -1,36 +1,101 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from pymongo import ASCENDING
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.database import get_database
+from app.utils.caching import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt takes 100-300 ms per call and releases the GIL, so it runs on a
+# dedicated pool sized to the cores instead of on the event loop
+_password_workers = settings.password_hash_workers or os.cpu_count() or 1
+_password_executor = ThreadPoolExecutor(max_workers=_password_workers, thread_name_prefix="bcrypt")
+_password_slots: Optional[asyncio.Semaphore] = None  # created on first use, inside the running loop
+
+# User records by JWT subject, for lookups on authenticated requests
+user_cache = TTLCache(settings.user_cache_max_entries, settings.user_cache_ttl_seconds)
+
+# Validated tokens -> subject, so repeat requests skip signature checks
+token_cache = TTLCache(settings.token_cache_max_entries, settings.token_cache_ttl_seconds)
+
+# Logged-out tokens by token id, kept until the token expires (TTL index),
+# so every API process refuses them
+REVOKED_TOKENS_COLLECTION = "revoked_tokens"
+
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
+async def _run_password_task(fn, *args):
+    global _password_slots
+    if _password_slots is None:
+        _password_slots = asyncio.Semaphore(_password_workers + settings.password_hash_max_pending)
+    if _password_slots.locked():
+        # Shed load instead of queueing without bound behind slow hashes
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests",
+            headers={"Retry-After": "1"},
+        )
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, fn, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool, without blocking the event loop"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool, without blocking the event loop"""
+    return await _run_password_task(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def _token_id(token: str, claims: Dict) -> str:
+    # Tokens issued before they carried a jti are identified by their hash
+    return claims.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _cache_ttl(payload: Dict) -> float:
+    """Seconds a validated token may stay cached: until exp, capped by settings"""
+    exp = payload.get("exp")
+    ttl = float(settings.token_cache_ttl_seconds)
+    if exp is not None:
+        ttl = min(ttl, float(exp) - time.time())
+    return ttl
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if settings.token_cache_enabled:
+        # A token seen before skips signature verification until it expires
+        username = token_cache.get(token)
+        if username is not None:
+            return username
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         username: str = payload.get("sub")
@@ -38,7 +103,67 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # Only checked on a cache miss: a revocation reaches other processes
+    # once their cached copy of the token expires (token_cache_ttl_seconds)
+    revocations = get_database()[REVOKED_TOKENS_COLLECTION]
+    if await revocations.find_one({"_id": _token_id(token, payload)}, {"_id": 1}) is not None:
+        raise credentials_exception
+    
+    if settings.token_cache_enabled:
+        ttl = _cache_ttl(payload)
+        if ttl > 0:
+            token_cache.set(token, username, ttl)
     
     # Here you would typically fetch the user from your database
     # For simplicity, we're just returning the username
-    return username
\ No newline at end of file
+    return username
+
+async def revoke_token(token: str):
+    """Invalidate a token, e.g. on logout.
+
+    The token is dropped from this process's validation cache and recorded
+    in MongoDB until it would have expired anyway, so every process refuses
+    it from its next cache miss on.
+    """
+    token_cache.pop(token)
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        return
+    exp = claims.get("exp")
+    if exp is not None:
+        expires_at = datetime.utcfromtimestamp(float(exp))
+    else:
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    if expires_at > datetime.utcnow():
+        await get_database()[REVOKED_TOKENS_COLLECTION].update_one(
+            {"_id": _token_id(token, claims)}, {"$set": {"expires_at": expires_at}}, upsert=True
+        )
+
+async def create_revocation_indexes(db):
+    """TTL index so revocations disappear once their token has expired"""
+    await db[REVOKED_TOKENS_COLLECTION].create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+def token_cache_stats() -> Dict:
+    """Hit rate and size of the validated-token cache"""
+    return token_cache.stats()
+
+async def get_current_user_record(current_user: str = Depends(get_current_user)) -> Dict:
+    """The authenticated user's record, served from a short-lived cache.
+
+    The record is looked up by the validated JWT subject and never includes
+    the password hash.
+    """
+    user = user_cache.get(current_user)
+    if user is None:
+        db = get_database()
+        user = await db["users"].find_one({"username": current_user}, {"hashed_password": 0})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user["id"] = str(user["_id"])
+        user_cache.set(current_user, user)
+    return dict(user)
+
+def invalidate_user(username: str):
+    """Drop a cached user record, e.g. after the user is changed"""
+    user_cache.pop(username)
@@ -34,13 +34,24 @@
 #     return {"message": "Document Processor API"}
 
 
+import asyncio
 import logging
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from app.routes import router as api_router
+from app.routes.documents import create_document_indexes
+from app.core.compression import StreamingGZipMiddleware
 from app.core.database import get_database
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, monitor_event_loop, monitor_queue, watch_cache
+from app.core.security import create_revocation_indexes, token_cache_stats, user_cache
+from app.processing.cache import create_cache_indexes, result_cache
+from app.processing.duplicates import create_duplicate_indexes
+from app.processing.jobs import create_job_indexes
+from app.processing.search import create_search_indexes
+from app.processing.texts import create_text_indexes
+from app.processing.typed_fields import create_typed_field_indexes
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
 
 # Configure logging
 logging.basicConfig(
@@ -65,8 +76,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Progress streams are left uncompressed so each event is pushed at once
+app.add_middleware(StreamingGZipMiddleware, minimum_size=1000)
+if settings.metrics_enabled:
+    # Outermost, so the latency includes every other middleware
+    app.add_middleware(MetricsMiddleware)
+    watch_cache("result", result_cache.stats)
+    watch_cache("token", token_cache_stats)
+    watch_cache("user", user_cache.stats)
 
 # Include API routes
 app.include_router(api_router, prefix="/api")
@@ -82,16 +101,35 @@ async def startup_db_client():
         
         # Create indexes
         await db.users.create_index("username", unique=True)
-        await db.documents.create_index("owner_id")
+        await create_document_indexes(db)
+        await create_job_indexes(db)
+        await create_cache_indexes(db)
+        await create_revocation_indexes(db)
+        await create_text_indexes(db)
+        await create_search_indexes(db)
+        await create_typed_field_indexes(db)
+        await create_duplicate_indexes(db)
         logger.info("Created database indexes")
     except Exception as e:
         logger.error(f"Error connecting to MongoDB: {e}")
         raise
 
+    if settings.metrics_enabled:
+        app.state.event_loop_monitor = asyncio.create_task(
+            monitor_event_loop(settings.event_loop_lag_interval_seconds)
+        )
+        app.state.queue_monitor = asyncio.create_task(monitor_queue(
+            db, settings.queue_metrics_interval_seconds, settings.queue_metrics_timeout_seconds
+        ))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connection"""
     logger.info("Shutting down database connections")
+    for name in ("event_loop_monitor", "queue_monitor"):
+        monitor = getattr(app.state, name, None)
+        if monitor is not None:
+            monitor.cancel()
     # Motor handles connection pooling, so no explicit close needed
 
 @app.get("/")
@@ -116,4 +154,11 @@ async def health_check():
             "status": "error",
             "database": "disconnected",
             "error": str(e)
-        }, 503
\ No newline at end of file
+        }, 503
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of the API process; queue counts come from a background task"""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
\ No newline at end of file
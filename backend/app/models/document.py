@@ -29,6 +29,49 @@ class Document(DocumentBase):
     class Config:
         from_attributes = True
 
+class BatchUploadItem(BaseModel):
+    filename: str
+    id: Optional[str] = None
+    status: Optional[DocumentStatus] = None
+    error: Optional[str] = None
+
+class BatchUploadResult(BaseModel):
+    documents: List[BatchUploadItem]
+    uploaded: int
+    failed: int
+
+class DocumentText(BaseModel):
+    document_id: str
+    page: Optional[int] = None
+    start: int = 0
+    end: int
+    total_length: int
+    text: str
+
+class SearchHit(BaseModel):
+    id: str
+    filename: str
+    content_type: str
+    upload_date: datetime
+    status: DocumentStatus
+    score: Optional[float] = None  # text relevance; None for field-only searches
+    pages: List[int] = []  # matching pages, best first
+    snippet: Optional[str] = None
+
+class SearchResults(BaseModel):
+    hits: List[SearchHit]
+    next_offset: Optional[int] = None
+
+class MonthlyTotal(BaseModel):
+    month: str  # YYYY-MM
+    currency: str
+    total: str  # decimal string, exact
+    documents: int
+
+class DuplicateCluster(BaseModel):
+    documents: List[str]  # ids of documents sharing near-duplicate pages
+    matched_pages: int
+
 class DocumentUpdate(BaseModel):
     status: Optional[DocumentStatus] = None
     extracted_data: Optional[Dict] = None
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+class Job(BaseModel):
+    id: str
+    document_id: str
+    content_type: str
+    status: JobStatus
+    attempts: int = 0
+    available_at: datetime
+    lease_expires_at: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,147 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from pymongo import ASCENDING
+from app.core.config import settings
+from app.processing.ocr import ocr_engine_version, ocr_settings_key
+from app.utils.caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_COLLECTION = "ocr_cache"
+# The OCR engine version each worker detected at start-up, by engine setting
+ENGINE_VERSIONS_COLLECTION = "ocr_engines"
+# How long the API trusts the recorded version before reading it again
+ENGINE_VERSION_TTL_SECONDS = 60
+
+def record_engine_version(db):
+    """Publish the engine version this worker runs, so the API builds the same cache keys"""
+    db[ENGINE_VERSIONS_COLLECTION].replace_one(
+        {"_id": settings.ocr_engine},
+        {"version": ocr_engine_version(), "recorded_at": datetime.utcnow()},
+        upsert=True
+    )
+
+async def create_cache_indexes(db):
+    """TTL index so MongoDB expires stale cache entries on its own"""
+    await db[RESULT_CACHE_COLLECTION].create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+class ResultCache:
+    """OCR results keyed by content hash and OCR settings.
+
+    MongoDB holds the shared copy (expired through a TTL index); an optional
+    in-process LRU sits in front of it. Lookups are available both for the
+    async API (motor) and for synchronous worker processes (pymongo).
+    """
+
+    def __init__(self, memory_entries: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.memory = TTLCache(memory_entries, ttl_seconds) if memory_entries else None
+        self.engine_versions = TTLCache(4, ENGINE_VERSION_TTL_SECONDS)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def key(self, content_hash: str, engine_version: Optional[str] = None) -> str:
+        return f"{content_hash}:{ocr_settings_key(engine_version)}"
+
+    async def worker_engine_version(self, db) -> Optional[str]:
+        """The engine version the workers recorded, None if no worker has started yet"""
+        version = self.engine_versions.get(settings.ocr_engine)
+        if version is None:
+            record = await db[ENGINE_VERSIONS_COLLECTION].find_one({"_id": settings.ocr_engine})
+            if record is None:
+                return None
+            version = record["version"]
+            self.engine_versions.set(settings.ocr_engine, version)
+        return version
+
+    def _from_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.memory is None:
+            return None
+        extracted_data = self.memory.get(key)
+        if extracted_data is not None:
+            self.memory_hits += 1
+        return extracted_data
+
+    def _record(self, key: str, entry: Optional[Dict]) -> Optional[Dict[str, Any]]:
+        if entry is None or entry["expires_at"] <= datetime.utcnow():
+            # The TTL monitor only runs once a minute, so check expiry here too
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        if self.memory is not None:
+            self.memory.set(key, entry["extracted_data"])
+        return entry["extracted_data"]
+
+    def _entry(self, key: str, content_hash: str, extracted_data: Dict[str, Any]) -> Dict:
+        now = datetime.utcnow()
+        return {
+            "content_hash": content_hash,
+            "settings_key": key.split(":", 1)[1],
+            "extracted_data": extracted_data,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+        }
+
+    async def get(self, db, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up cached extracted_data for a file (async); errors count as a miss"""
+        try:
+            engine_version = await self.worker_engine_version(db)
+            if engine_version is None:
+                self.misses += 1
+                return None
+            key = self.key(content_hash, engine_version)
+            extracted_data = self._from_memory(key)
+            if extracted_data is not None:
+                return extracted_data
+            entry = await db[RESULT_CACHE_COLLECTION].find_one({"_id": key})
+        except Exception as e:
+            logger.error(f"Error reading cached result for {content_hash}: {e}")
+            self.misses += 1
+            return None
+        return self._record(key, entry)
+
+    def get_sync(self, db, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up cached extracted_data for a file (blocking); errors count as a miss"""
+        try:
+            key = self.key(content_hash)
+            extracted_data = self._from_memory(key)
+            if extracted_data is not None:
+                return extracted_data
+            entry = db[RESULT_CACHE_COLLECTION].find_one({"_id": key})
+        except Exception as e:
+            logger.error(f"Error reading cached result for {content_hash}: {e}")
+            self.misses += 1
+            return None
+        return self._record(key, entry)
+
+    def put_sync(self, db, content_hash: str, extracted_data: Dict[str, Any]):
+        """Store the result of processing a file (blocking)"""
+        try:
+            key = self.key(content_hash)
+            db[RESULT_CACHE_COLLECTION].replace_one(
+                {"_id": key}, self._entry(key, content_hash, extracted_data), upsert=True
+            )
+        except Exception as e:
+            # A cache write failure must not fail the job
+            logger.error(f"Error caching result for {content_hash}: {e}")
+            return
+        if self.memory is not None:
+            self.memory.set(key, extracted_data)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory) if self.memory is not None else 0,
+        }
+
+result_cache = ResultCache(
+    memory_entries=settings.result_cache_memory_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+)
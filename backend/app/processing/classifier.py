@@ -1,23 +1,48 @@
 import logging
+import threading
 from typing import Dict, Optional
 import magic
 import re
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Filename patterns, compiled once
+DATE_PATTERNS = [
+    re.compile(r'\d{4}-\d{2}-\d{2}'),  # YYYY-MM-DD
+    re.compile(r'\d{2}-\d{2}-\d{4}'),  # DD-MM-YYYY
+    re.compile(r'\d{8}'),              # YYYYMMDD
+]
+ID_PATTERN = re.compile(r'[A-Z]{2,3}-\d{4,6}')  # Invoice numbers, IDs, etc.
+
+# Loading the magic database is expensive and handles are not thread-safe,
+# so each thread keeps its own
+_local = threading.local()
+
+def get_magic() -> magic.Magic:
+    """This thread's libmagic handle, created on first use"""
+    handle = getattr(_local, "magic", None)
+    if handle is None:
+        handle = _local.magic = magic.Magic(mime=True)
+    return handle
+
 class DocumentClassifier:
     """Classify documents and extract metadata"""
     
     @staticmethod
-    def classify_document(file_data: bytes, filename: str) -> Dict:
-        """Classify document type and extract basic metadata"""
+    def classify_document(file_data: bytes, filename: str, size: Optional[int] = None) -> Dict:
+        """Classify document type and extract basic metadata.
+
+        Only the first classifier_header_bytes of file_data are inspected, so
+        a header prefix is enough; pass the full size separately in that case.
+        """
         try:
-            mime = magic.Magic(mime=True)
-            file_type = mime.from_buffer(file_data)
+            header = bytes(file_data[:settings.classifier_header_bytes])
+            file_type = get_magic().from_buffer(header)
             
             metadata = {
                 "type": file_type,
-                "size": len(file_data),
+                "size": len(file_data) if size is None else size,
                 "filename": filename,
                 "is_text": False,
                 "is_image": False,
@@ -48,23 +73,24 @@ class DocumentClassifier:
         """Extract metadata from filename patterns"""
         metadata = {}
         
-        # Common patterns
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}-\d{2}-\d{4}',  # DD-MM-YYYY
-            r'\d{8}',              # YYYYMMDD
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, filename)
+        for pattern in DATE_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 metadata["filename_date"] = match.group()
                 break
         
-        # Invoice numbers, IDs, etc.
-        id_pattern = r'[A-Z]{2,3}-\d{4,6}'
-        match = re.search(id_pattern, filename)
+        match = ID_PATTERN.search(filename)
         if match:
             metadata["filename_id"] = match.group()
         
-        return metadata
\ No newline at end of file
+        return metadata
+
+# Sniffed types that say too little to override what the client declared
+# (OOXML documents are zip files to older libmagic versions)
+GENERIC_TYPES = {"application/octet-stream", "application/zip", "inode/x-empty"}
+
+def routing_type(sniffed_type: str, declared_type: Optional[str]) -> str:
+    """Content type to process a document as: the sniffed one unless it is too generic"""
+    if sniffed_type in GENERIC_TYPES and declared_type:
+        return declared_type
+    return sniffed_type
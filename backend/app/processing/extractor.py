@@ -1,31 +1,31 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+from app.processing.duplicates import PageHashIndex
 from app.processing.ocr import process_document
-from app.utils.file_handling import save_temp_file, cleanup_temp_file
+from app.processing.progress import ProgressReporter
+from app.processing.source import DocumentSource
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-async def extract_document_data(file_data: bytes, file_type: str) -> Dict[str, Any]:
-    """Process document and extract data"""
+def run_extraction(source: DocumentSource, file_type: str, progress: Optional[ProgressReporter] = None,
+                   page_index: Optional[PageHashIndex] = None) -> Dict[str, Any]:
+    """Process document and extract data (blocking, for worker processes)"""
     try:
-        # Save to temp file for processing
-        temp_file_path = save_temp_file(file_data, file_type)
-        
-        # Process the document
-        full_text, key_value_pairs = process_document(file_data, file_type)
-        
-        # Cleanup
-        cleanup_temp_file(temp_file_path)
+        pages, key_value_pairs, provenance = process_document(
+            source, file_type, progress=progress, page_index=page_index
+        )
         
         return {
-            "full_text": full_text,
+            "full_text": "\n\n".join(page["text"] for page in pages),
+            "pages": pages,
             "key_value_pairs": key_value_pairs,
+            "provenance": provenance,
             "metadata": {
                 "processing_time": datetime.now().isoformat(),
-                "pages_processed": len(full_text.split('--- PAGE')) - 1 if '--- PAGE' in full_text else 1
+                "pages_processed": len(pages)
             }
         }
     except Exception as e:
         logger.error(f"Error in document extraction: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,174 @@
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ASCENDING, ReturnDocument
+from app.core.config import settings
+from app.models.job import JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "jobs"
+
+class PermanentJobError(Exception):
+    """A failure retrying cannot fix, such as an unsupported or corrupt file"""
+
+def new_job(document_id: str, content_type: str, content_hash: Optional[str] = None,
+            owner_id: Optional[str] = None) -> Dict:
+    """Build the queue record for a freshly uploaded document"""
+    now = datetime.utcnow()
+    return {
+        "document_id": document_id,
+        "owner_id": owner_id,
+        "content_type": content_type,
+        "content_hash": content_hash,
+        "status": JobStatus.QUEUED.value,
+        "attempts": 0,
+        "available_at": now,
+        "lease_expires_at": None,
+        "worker_id": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+
+async def enqueue_jobs(db, jobs: List[Dict]):
+    """Add several jobs (built with new_job) in one write"""
+    if jobs:
+        await db[JOBS_COLLECTION].insert_many(jobs, ordered=False)
+
+async def create_job_indexes(db):
+    """Indexes backing claim and lease-recovery queries"""
+    await db[JOBS_COLLECTION].create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+    await db[JOBS_COLLECTION].create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+    await db[JOBS_COLLECTION].create_index("document_id")
+    # Succeeded and failed jobs expire; queued and running ones have no finished_at
+    await db[JOBS_COLLECTION].create_index(
+        [("finished_at", ASCENDING)], expireAfterSeconds=settings.job_retention_seconds
+    )
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff (with jitter) after the given number of attempts"""
+    delay = settings.job_retry_backoff_seconds * (2 ** max(attempts - 1, 0))
+    delay = min(delay, settings.job_retry_backoff_max_seconds)
+    return delay * random.uniform(0.5, 1.0)
+
+class JobQueue:
+    """Lease-based job queue on top of a MongoDB collection.
+
+    The queue works on a synchronous pymongo collection so it can be driven
+    from worker processes; any object with the pymongo collection API (e.g. a
+    mongomock collection) can be passed in for local testing.
+    """
+
+    def __init__(self, collection, lease_seconds: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.collection = collection
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self.max_attempts = max_attempts or settings.job_max_attempts
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Atomically take the next runnable job and lease it to worker_id.
+
+        Jobs whose lease has expired (the worker crashed or hung) are picked
+        up again here, which is how abandoned work gets recovered.
+        """
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": JobStatus.QUEUED.value, "available_at": {"$lte": now}},
+                    {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+                ],
+                "attempts": {"$lt": self.max_attempts},
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def heartbeat(self, job: Dict) -> bool:
+        """Extend the lease on a running job. Returns False if the lease was lost."""
+        now = datetime.utcnow()
+        result = self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"], "status": JobStatus.RUNNING.value},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now,
+            }}
+        )
+        return result.modified_count == 1
+
+    def complete(self, job: Dict):
+        """Mark a job as finished successfully"""
+        now = datetime.utcnow()
+        self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": {
+                "status": JobStatus.SUCCEEDED.value,
+                "lease_expires_at": None,
+                "updated_at": now,
+                "finished_at": now,
+            }}
+        )
+
+    def fail(self, job: Dict, error: str, retryable: bool = True) -> bool:
+        """Record a failed attempt. Returns True if the job will be retried.
+
+        Non-retryable failures fail the job at once, whatever attempts are left.
+        """
+        now = datetime.utcnow()
+        retry = retryable and job["attempts"] < self.max_attempts
+        update = {
+            "lease_expires_at": None,
+            "last_error": error,
+            "updated_at": now,
+        }
+        if retry:
+            update["status"] = JobStatus.QUEUED.value
+            update["available_at"] = now + timedelta(seconds=retry_delay(job["attempts"]))
+        else:
+            update["status"] = JobStatus.FAILED.value
+            update["finished_at"] = now
+        self.collection.update_one(
+            {"_id": job["_id"], "worker_id": job["worker_id"]},
+            {"$set": update}
+        )
+        return retry
+
+    def reap_abandoned(self) -> List[Dict]:
+        """Fail expired jobs that have no attempts left and return them.
+
+        claim() only re-leases expired jobs that still have attempts to spare;
+        anything else would otherwise sit in RUNNING forever.
+        """
+        now = datetime.utcnow()
+        reaped = []
+        while True:
+            job = self.collection.find_one_and_update(
+                {
+                    "status": JobStatus.RUNNING.value,
+                    "lease_expires_at": {"$lt": now},
+                    "attempts": {"$gte": self.max_attempts},
+                },
+                {"$set": {
+                    "status": JobStatus.FAILED.value,
+                    "lease_expires_at": None,
+                    "last_error": "Lease expired with no attempts remaining",
+                    "updated_at": now,
+                    "finished_at": now,
+                }},
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None:
+                return reaped
+            logger.warning(f"Job {job['_id']} for document {job['document_id']} abandoned after {job['attempts']} attempts")
+            reaped.append(job)
@@ -0,0 +1,121 @@
+import re
+from typing import Any, Dict, List, Optional, Pattern
+
+# Key/value rules, matched against one line at a time. Keys start with a
+# capital letter and run over letters and spaces, as in the original
+# patterns, but never across line breaks.
+KEY = r"(?P<key>[A-Z][a-zA-Z \t]*?)"
+COLON_PATTERN = re.compile(KEY + r"[ \t]*:[ \t]*(?P<value>\S.*)")
+EQUALS_PATTERN = re.compile(KEY + r"[ \t]*=[ \t]*(?P<value>\S.*)")
+WHITESPACE_PATTERN = re.compile(r"(?P<key>[A-Z][a-zA-Z \t]*[a-zA-Z])[ \t]+(?P<value>[^ \t].*)")
+
+# Document-type specific rules
+INVOICE_NUMBER_PATTERN = re.compile(
+    r"(?P<key>Invoice[ \t]*(?:No|Number|#))\.?[ \t]*[:#]?[ \t]*(?P<value>[A-Z0-9][A-Z0-9-]*)", re.IGNORECASE
+)
+RECEIPT_TOTAL_PATTERN = re.compile(
+    r"(?P<key>(?:Grand[ \t]+)?Total|Subtotal|Tax|Change|Cash)[ \t]*:?[ \t]*(?P<value>\$?\d[\d,]*\.\d{2})", re.IGNORECASE
+)
+
+# Dates and amounts are picked up anywhere in a line, in a single pass
+VALUE_PATTERN = re.compile(r"(?P<date>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})|(?P<amount>\$\d+\.\d{2})")
+
+class Rule:
+    """A named key/value pattern with `key` and `value` groups"""
+
+    def __init__(self, name: str, pattern: Pattern):
+        self.name = name
+        self.pattern = pattern
+
+    def match(self, line: str) -> Optional[re.Match]:
+        return self.pattern.search(line)
+
+DEFAULT_RULES = [
+    Rule("colon separated", COLON_PATTERN),
+    Rule("equals separated", EQUALS_PATTERN),
+    Rule("line separated", WHITESPACE_PATTERN),
+]
+
+# Rules are tried in list order and the first match on a line wins
+RULE_SETS: Dict[str, List[Rule]] = {
+    "default": DEFAULT_RULES,
+    "invoice": [Rule("invoice number", INVOICE_NUMBER_PATTERN)] + DEFAULT_RULES,
+    "receipt": [Rule("receipt total", RECEIPT_TOTAL_PATTERN)] + DEFAULT_RULES,
+}
+
+class KeyValueExtractor:
+    """Single-pass key/value, date and amount extraction.
+
+    The text is split into lines once. Each line is matched against the
+    rule set in precedence order and contributes at most one pair; when a
+    key appears on several lines the last occurrence wins. Dates and
+    amounts are collected from the same pass, so the cost is linear in the
+    length of the text.
+    """
+
+    def __init__(self, document_type: str = "default"):
+        if document_type not in RULE_SETS:
+            raise ValueError(f"Unknown document type: {document_type}")
+        self.rules = RULE_SETS[document_type]
+
+    def extract(self, text: str) -> Dict:
+        pairs = {}
+        dates = []
+        amounts = []
+
+        for line in text.splitlines():
+            if not line or line.isspace():
+                continue
+            for rule in self.rules:
+                match = rule.match(line)
+                if match:
+                    key = match.group("key").strip()
+                    value = match.group("value").strip()
+                    if key and value:
+                        pairs[key] = value
+                        break
+            for match in VALUE_PATTERN.finditer(line):
+                if match.lastgroup == "date":
+                    dates.append(match.group())
+                else:
+                    amounts.append(match.group())
+
+        if dates:
+            pairs['extracted_dates'] = dates
+        if amounts:
+            pairs['extracted_amounts'] = amounts
+        return pairs
+
+class KeyValueAccumulator:
+    """Incremental extraction over the pages of a document.
+
+    Each page is scanned once, as soon as its text is available, and merged
+    into a running state. Later pages overwrite earlier values for the same
+    key; dates and amounts accumulate. `provenance` records the page each
+    value came from (a list of pages for the date and amount lists).
+    """
+
+    def __init__(self, document_type: str = "default"):
+        self.extractor = KeyValueExtractor(document_type)
+        self.pairs: Dict[str, Any] = {}
+        self.provenance: Dict[str, Any] = {}
+
+    def feed(self, text: str, page: int) -> Dict:
+        """Scan one page, merge it into the running state and return its own fields"""
+        fields = self.extractor.extract(text)
+        for key, value in fields.items():
+            if key in ('extracted_dates', 'extracted_amounts'):
+                self.pairs.setdefault(key, []).extend(value)
+                self.provenance.setdefault(key, []).extend([page] * len(value))
+            else:
+                self.pairs[key] = value
+                self.provenance[key] = page
+        return fields
+
+_extractors = {name: KeyValueExtractor(name) for name in RULE_SETS}
+
+def extract_pairs(text: str, document_type: str = "default") -> Dict:
+    """Extract key/value pairs with the rule set for document_type"""
+    if document_type not in _extractors:
+        raise ValueError(f"Unknown document type: {document_type}")
+    return _extractors[document_type].extract(text)
@@ -1,96 +1,521 @@
 import pytesseract
 from PIL import Image
 import pdf2image
+from pdf2image.exceptions import PDFSyntaxError
 import io
 import os
+import re
 import tempfile
-from typing import Dict, List, Tuple
+import subprocess
+import threading
+import time
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 import logging
 from datetime import datetime
+from functools import lru_cache
+from app.core.config import settings
+from app.core.metrics import PAGES_TOTAL, STAGE_SECONDS
+from app.processing.duplicates import PageHashIndex
+from app.processing.kv_extraction import KeyValueAccumulator, extract_pairs
+from app.processing.preprocess import PROBE_DPI, PreprocessOptions, choose_dpi, preprocess_image
+from app.processing.progress import ProgressReporter
+from app.processing.source import DocumentSource
+from app.processing.text_layer import iter_docx_paragraphs, pdf_text_layer
 
 logger = logging.getLogger(__name__)
 
-def extract_text_from_image(image_data: bytes) -> str:
-    """Extract text from image bytes using Tesseract OCR"""
+# Process pool for page-level OCR, created on first use in each worker process
+_page_pool: Optional[ProcessPoolExecutor] = None
+# Semaphore shared by all worker processes of a host, one slot per Tesseract
+# run the cores can take at once (see worker.run_worker_pool)
+_core_slots = None
+
+def image_to_pnm(image: Image.Image) -> bytes:
+    """Encode an image as uncompressed PNM (lossless and nearly free to write)"""
+    if image.mode not in ("1", "L", "RGB"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PPM")
+    return buffer.getvalue()
+
+def run_tesseract(image: Image.Image, lang: Optional[str] = None) -> str:
+    """OCR an in-memory image by piping it to tesseract's stdin.
+
+    pytesseract.image_to_string writes every image to a temp file and reads
+    the result back from another one; feeding raw PNM over a pipe avoids
+    both files and any lossy re-encoding.
+    """
+    lang = lang or settings.ocr_language
+    command = [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", lang]
+    result = subprocess.run(command, input=image_to_pnm(image), capture_output=True)
+    if result.returncode != 0:
+        raise pytesseract.TesseractError(result.returncode, result.stderr.decode("utf-8", "replace"))
+    return result.stdout.decode("utf-8")
+
+class OCREngine(ABC):
+    """Interface implemented by the OCR backends"""
+    name = "base"
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    @abstractmethod
+    def image_to_string(self, image: Image.Image) -> str:
+        """Text of one page image"""
+
+    @classmethod
+    @abstractmethod
+    def version(cls) -> str:
+        """Version of the underlying Tesseract"""
+
+    def close(self):
+        pass
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary once per image"""
+    name = "pytesseract"
+
+    def image_to_string(self, image: Image.Image) -> str:
+        return run_tesseract(image, self.lang)
+
+    @classmethod
+    def version(cls) -> str:
+        return str(pytesseract.get_tesseract_version())
+
+class TesserocrEngine(OCREngine):
+    """Keeps one Tesseract API handle loaded and reuses it across pages"""
+    name = "tesserocr"
+
+    def __init__(self, lang: str):
+        super().__init__(lang)
+        import tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang=lang)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+    @classmethod
+    def version(cls) -> str:
+        import tesserocr
+        return tesserocr.tesseract_version().split()[1]
+
+    def close(self):
+        self._api.End()
+
+OCR_ENGINES = {
+    TesserocrEngine.name: TesserocrEngine,
+    PytesseractEngine.name: PytesseractEngine,
+}
+
+# Tesseract handles are not thread-safe, so each thread gets its own engine
+_engines = threading.local()
+
+def create_ocr_engine(name: Optional[str] = None, lang: Optional[str] = None) -> OCREngine:
+    """Instantiate an OCR engine, falling back to pytesseract if unavailable"""
+    name = name or settings.ocr_engine
+    lang = lang or settings.ocr_language
+    if name not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+    try:
+        return OCR_ENGINES[name](lang)
+    except ImportError:
+        logger.warning(f"OCR engine {name} is not installed, falling back to pytesseract")
+        return PytesseractEngine(lang)
+
+def get_ocr_engine() -> OCREngine:
+    """Return this thread's OCR engine, creating it on first use"""
+    engine = getattr(_engines, "engine", None)
+    if engine is None:
+        engine = _engines.engine = create_ocr_engine()
+    return engine
+
+def ocr_settings_key(engine_version: Optional[str] = None) -> str:
+    """Identify everything that affects OCR output, for result caching.
+
+    The engine version is the one this process detects unless given, so
+    results from before a Tesseract upgrade are never reused. The API, which
+    may not have Tesseract installed, passes the version the workers
+    recorded (see cache.record_engine_version).
+    """
+    engine = engine_version or ocr_engine_version()
+    key = f"{engine}:{settings.ocr_language}:{PreprocessOptions.from_settings().key()}"
+    if settings.text_layer_enabled:
+        key += f":textlayer{settings.text_layer_min_chars}"
+    return key
+
+@lru_cache(maxsize=1)
+def ocr_engine_version() -> str:
+    """Name and version of the engine this process actually runs, or why it is unknown"""
+    engine_class = OCR_ENGINES.get(settings.ocr_engine, PytesseractEngine)
+    try:
+        try:
+            return f"{engine_class.name}-{engine_class.version()}"
+        except ImportError:
+            return f"{PytesseractEngine.name}-{PytesseractEngine.version()}"
+    except Exception as e:
+        logger.warning(f"Could not determine the OCR engine version: {e}")
+        return "unknown"
+
+def extract_text_from_image(image: Union[Image.Image, bytes]) -> str:
+    """Extract text from a PIL image or encoded image bytes using Tesseract OCR"""
     try:
-        image = Image.open(io.BytesIO(image_data))
-        text = pytesseract.image_to_string(image)
-        return text
+        if not isinstance(image, Image.Image):
+            image = Image.open(io.BytesIO(image))
+        return get_ocr_engine().image_to_string(image)
     except Exception as e:
         logger.error(f"Error extracting text from image: {e}")
         raise
 
-def convert_pdf_to_images(pdf_data: bytes, dpi: int = 300) -> List[bytes]:
-    """Convert PDF to a list of image bytes"""
+def get_pdf_page_count(pdf_path: str) -> int:
+    """Number of pages in a PDF file"""
+    return pdf2image.pdfinfo_from_path(pdf_path)["Pages"]
+
+# Header of a binary PGM/PPM image: magic, width, height, maxval
+PNM_HEADER = re.compile(rb"(P[56])\s+(\d+)\s+(\d+)\s+255\s")
+
+def iter_pnm_images(data: bytes) -> Iterator[Image.Image]:
+    """Split the concatenated PGM/PPM images pdftoppm writes to stdout"""
+    offset = 0
+    while offset < len(data):
+        header = PNM_HEADER.match(data, offset)
+        if header is None:
+            raise ValueError(f"Unexpected rasterizer output at byte {offset}")
+        mode = "L" if header.group(1) == b"P5" else "RGB"
+        size = (int(header.group(2)), int(header.group(3)))
+        end = header.end() + size[0] * size[1] * len(mode)
+        yield Image.frombytes(mode, size, data[header.end():end])
+        offset = end
+
+def render_pdf_pages(pdf_path: str, dpi: int, first_page: int, last_page: int,
+                     grayscale: bool = False) -> Iterator[Image.Image]:
+    """Rasterize a range of PDF pages with a single pdftoppm run.
+
+    pdf2image's convert_from_path runs pdfinfo before every pdftoppm call;
+    calling pdftoppm directly halves the subprocesses per page.
+    """
+    command = ["pdftoppm", "-r", str(dpi), "-f", str(first_page), "-l", str(last_page)]
+    if grayscale:
+        command.append("-gray")
+    command.append(pdf_path)
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        raise PDFSyntaxError(result.stderr.decode("utf-8", "replace").strip())
+    return iter_pnm_images(result.stdout)
+
+def iter_pdf_images(pdf_path: str, dpi: int = 300, first_page: int = 1,
+                    last_page: Optional[int] = None, window: Optional[int] = None,
+                    grayscale: bool = False) -> Iterator[Image.Image]:
+    """Rasterize a PDF lazily, a small window of pages at a time.
+
+    Only `window` pages are held in memory at once, so peak memory does not
+    grow with the page count. Each page is yielded before the next window
+    is rendered. The page count is only looked up when last_page is not given.
+    """
+    window = max(window or settings.ocr_render_window, 1)
+    if last_page is None:
+        last_page = get_pdf_page_count(pdf_path)
     try:
-        images = pdf2image.convert_from_bytes(pdf_data, dpi=dpi)
-        image_bytes_list = []
-        for image in images:
-            img_byte_arr = io.BytesIO()
-            image.save(img_byte_arr, format='JPEG')
-            image_bytes_list.append(img_byte_arr.getvalue())
-        return image_bytes_list
+        for start in range(first_page, last_page + 1, window):
+            end = min(start + window - 1, last_page)
+            yield from render_pdf_pages(pdf_path, dpi, start, end, grayscale)
     except Exception as e:
         logger.error(f"Error converting PDF to images: {e}")
         raise
 
-def process_document(file_data: bytes, file_type: str) -> Tuple[str, Dict]:
-    """Process document and extract text and key-value pairs"""
+def core_budget() -> int:
+    """Tesseract runs of ocr_tesseract_threads each that the cores take at once"""
+    return max(1, (os.cpu_count() or 1) // max(settings.ocr_tesseract_threads, 1))
+
+def set_core_slots(slots):
+    """Share the host's core budget (a multiprocessing semaphore) with this process"""
+    global _core_slots
+    _core_slots = slots
+
+@contextmanager
+def core_slot():
+    """Hold one slot of the shared core budget, waiting for one if needed"""
+    if _core_slots is None:
+        yield
+        return
+    _core_slots.acquire()
     try:
-        full_text = ""
-        key_value_pairs = {}
-        
-        if file_type in ['image/jpeg', 'image/png']:
-            full_text = extract_text_from_image(file_data)
-            key_value_pairs = extract_key_value_pairs(full_text)
-        elif file_type == 'application/pdf':
-            images = convert_pdf_to_images(file_data)
-            for i, image_data in enumerate(images):
-                page_text = extract_text_from_image(image_data)
-                full_text += f"\n--- PAGE {i+1} ---\n{page_text}\n"
-                if i == 0:  # Extract key-value pairs from first page only
-                    key_value_pairs = extract_key_value_pairs(page_text)
-        elif file_type in ['text/plain', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-            # For text and Word docs, we can read directly
-            full_text = file_data.decode('utf-8')
-            key_value_pairs = extract_key_value_pairs(full_text)
+        yield
+    finally:
+        _core_slots.release()
+
+def _borrow_core_slot() -> bool:
+    return _core_slots is None or _core_slots.acquire(False)
+
+def _return_core_slot():
+    if _core_slots is not None:
+        _core_slots.release()
+
+def ocr_worker_count() -> int:
+    """Number of page OCR processes per worker process.
+
+    By default a single document may use every core. Worker processes share
+    the core budget: each holds a slot while it runs a job, and the pages of
+    a large scan only borrow the slots other workers leave free, so all
+    workers together still run at most one Tesseract thread per core.
+    """
+    if settings.ocr_workers:
+        return settings.ocr_workers
+    return core_budget()
+
+def _init_page_worker(tesseract_threads: int):
+    # Tesseract's OpenMP threads would otherwise multiply with our processes
+    os.environ["OMP_THREAD_LIMIT"] = str(tesseract_threads)
+
+def get_page_pool() -> ProcessPoolExecutor:
+    """Return the shared page OCR pool, starting it if needed"""
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(
+            max_workers=ocr_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_page_worker,
+            initargs=(settings.ocr_tesseract_threads,)
+        )
+    return _page_pool
+
+def shutdown_page_pool():
+    """Stop the page OCR processes, e.g. while the worker has nothing to do"""
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown()
+        _page_pool = None
+
+def ocr_page(image: Image.Image, page_number: int, options: PreprocessOptions,
+             page_index: Optional[PageHashIndex] = None) -> Tuple[str, str]:
+    """Preprocess and OCR one rasterized page.
+
+    With a page_index the page is hashed first and recorded for near-duplicate
+    detection; when duplicate_reuse_ocr is on, the earlier text of a
+    near-duplicate page is returned instead of running OCR. Returns the text
+    and where it came from ("ocr" or "reused").
+    """
+    if page_index is not None:
+        text = page_index.check_page(image, page_number)
+        if text is not None:
+            return text, "reused"
+    prepared = preprocess_image(image, options)
+    text = extract_text_from_image(prepared)
+    prepared.close()
+    return text, "ocr"
+
+def record_page(source: str, rasterize_seconds: Optional[float] = None, ocr_seconds: Optional[float] = None):
+    """Count a finished page and its stage timings"""
+    PAGES_TOTAL.inc(source=source)
+    if rasterize_seconds is not None:
+        STAGE_SECONDS.observe(rasterize_seconds, stage="rasterize")
+    if ocr_seconds is not None and source == "ocr":
+        STAGE_SECONDS.observe(ocr_seconds, stage="ocr")
+
+def _ocr_pdf_page(pdf_path: str, page_number: int, options: PreprocessOptions,
+                  page_index: Optional[PageHashIndex] = None) -> Tuple[str, str, float, float]:
+    """Rasterize, preprocess and OCR a single PDF page (runs inside the page pool).
+
+    Stage timings are returned rather than recorded, since metrics live in
+    the process that exports them.
+    """
+    start = time.perf_counter()
+    image = next(iter_ocr_images(pdf_path, [page_number], options))
+    rendered = time.perf_counter()
+    text, source = ocr_page(image, page_number, options, page_index)
+    return text, source, rendered - start, time.perf_counter() - rendered
+
+def _page_runs(page_numbers: List[int]) -> Iterator[Tuple[int, int]]:
+    """Group sorted page numbers into (first, last) runs of consecutive pages"""
+    first = last = None
+    for page_number in page_numbers:
+        if last is not None and page_number == last + 1:
+            last = page_number
+            continue
+        if first is not None:
+            yield first, last
+        first = last = page_number
+    if first is not None:
+        yield first, last
+
+def iter_ocr_images(pdf_path: str, page_numbers: List[int], options: PreprocessOptions) -> Iterator[Image.Image]:
+    """Render the given pages of a PDF at the resolution chosen by options.
+
+    With dpi_mode "auto" each page is first rendered at PROBE_DPI to measure
+    its text, then rendered again at the DPI that measurement calls for.
+    Pages come out in grayscale unless options keep colour.
+    """
+    grayscale = options.color_mode != "color"
+    if options.dpi_mode == "auto":
+        for page_number in page_numbers:
+            probe = next(iter_pdf_images(pdf_path, PROBE_DPI, page_number, page_number, grayscale=True))
+            dpi = choose_dpi(probe, PROBE_DPI, options)
+            probe.close()
+            yield from iter_pdf_images(pdf_path, dpi, page_number, page_number, grayscale=grayscale)
+    else:
+        for first_page, last_page in _page_runs(page_numbers):
+            yield from iter_pdf_images(pdf_path, options.dpi, first_page, last_page, grayscale=grayscale)
+
+def ocr_pdf_serial(pdf_path: str, page_numbers: List[int], options: Optional[PreprocessOptions] = None,
+                   page_index: Optional[PageHashIndex] = None) -> Iterator[str]:
+    """OCR the given pages of a PDF one after another, rendering each on demand"""
+    options = options or PreprocessOptions.from_settings()
+    images = iter_ocr_images(pdf_path, page_numbers, options)
+    for page_number in page_numbers:
+        start = time.perf_counter()
+        image = next(images)
+        rendered = time.perf_counter()
+        text, source = ocr_page(image, page_number, options, page_index)
+        record_page(source, rendered - start, time.perf_counter() - rendered)
+        image.close()
+        yield text
+
+def ocr_pdf_parallel(pdf_path: str, page_numbers: List[int], options: Optional[PreprocessOptions] = None,
+                     page_index: Optional[PageHashIndex] = None) -> Iterator[str]:
+    """OCR the given pages of a PDF across the page pool, yielding texts in order.
+
+    Each page is yielded as soon as it and all pages before it are done. At
+    most ocr_max_pages_in_flight pages are submitted or waiting to be
+    yielded at once, so memory stays bounded however long the document is.
+    One page runs on the worker's own core slot; every further page in
+    flight borrows a free slot of the shared core budget.
+    """
+    options = options or PreprocessOptions.from_settings()
+    pool = get_page_pool()
+    max_in_flight = settings.ocr_max_pages_in_flight or 2 * ocr_worker_count()
+    borrowed = 0
+    try:
+        finished = {}
+        pending = {}
+        next_index = 0
+        next_to_yield = 0
+        while next_to_yield < len(page_numbers):
+            while next_index < len(page_numbers) and len(pending) + len(finished) < max_in_flight:
+                if pending:
+                    if not _borrow_core_slot():
+                        break
+                    borrowed += 1
+                future = pool.submit(_ocr_pdf_page, pdf_path, page_numbers[next_index], options, page_index)
+                pending[future] = next_index
+                next_index += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[pending.pop(future)] = future.result()
+            # Give back the slots of pages that are no longer running
+            while borrowed > max(len(pending) - 1, 0):
+                _return_core_slot()
+                borrowed -= 1
+            while next_to_yield in finished:
+                text, source, rasterize_seconds, ocr_seconds = finished.pop(next_to_yield)
+                record_page(source, rasterize_seconds, ocr_seconds)
+                yield text
+                next_to_yield += 1
+    except Exception as e:
+        logger.error(f"Error running parallel PDF OCR: {e}")
+        raise
+    finally:
+        for _ in range(borrowed):
+            _return_core_slot()
+
+def iter_pdf_texts(pdf_path: str, on_page_count: Callable[[int], None],
+                   page_index: Optional[PageHashIndex] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page number, text) for a PDF, OCRing only pages without a text layer.
+
+    Born-digital pages are read from the embedded text layer in
+    milliseconds; scanned pages are rasterized and OCRed as before.
+    """
+    if settings.text_layer_enabled:
+        with STAGE_SECONDS.time(stage="text_layer"):
+            layer = pdf_text_layer(pdf_path)
+    else:
+        layer = [None] * get_pdf_page_count(pdf_path)
+    on_page_count(len(layer))
+    ocr_pages = [i + 1 for i, text in enumerate(layer) if text is None]
+    if len(layer) > len(ocr_pages):
+        logger.info(f"{pdf_path}: {len(layer) - len(ocr_pages)} of {len(layer)} pages read from the text layer")
+
+    if len(ocr_pages) >= settings.ocr_parallel_min_pages and ocr_worker_count() > 1:
+        ocr_texts = ocr_pdf_parallel(pdf_path, ocr_pages, page_index=page_index)
+    else:
+        ocr_texts = ocr_pdf_serial(pdf_path, ocr_pages, page_index=page_index)
+    for i, text in enumerate(layer):
+        if text is not None:
+            record_page("text_layer")
+            yield i + 1, text
         else:
-            raise ValueError(f"Unsupported file type: {file_type}")
-        
-        return full_text, key_value_pairs
+            yield i + 1, next(ocr_texts)
+
+def open_image(source: DocumentSource) -> Image.Image:
+    """Open an image document without copying it into a separate buffer"""
+    if source.path is not None:
+        return Image.open(source.path)
+    with source.buffer() as view:
+        return Image.open(io.BytesIO(view))
+
+DOCX_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+def iter_page_texts(source: DocumentSource, file_type: str,
+                    on_page_count: Optional[Callable[[int], None]] = None,
+                    page_index: Optional[PageHashIndex] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page number, text) for each page as soon as it is available.
+
+    on_page_count, if given, is called with the number of pages before the
+    first one is processed. Rasterized pages are checked against page_index
+    for near-duplicates when one is given.
+    """
+    on_page_count = on_page_count or (lambda count: None)
+    if file_type in ['image/jpeg', 'image/png']:
+        on_page_count(1)
+        with open_image(source) as image:
+            start = time.perf_counter()
+            text, page_source = ocr_page(image, 1, PreprocessOptions.from_settings(), page_index)
+            record_page(page_source, ocr_seconds=time.perf_counter() - start)
+            yield 1, text
+    elif file_type == 'application/pdf':
+        # Read or rasterize straight from the stored file
+        yield from iter_pdf_texts(source.file_path(), on_page_count, page_index)
+    elif file_type == DOCX_TYPE:
+        # .docx has no fixed pages; its text is treated as a single page
+        on_page_count(1)
+        record_page("native")
+        yield 1, "\n".join(iter_docx_paragraphs(source.file_path()))
+    elif file_type.startswith('text/') or file_type == 'application/msword':
+        # For text and Word docs, we can read directly
+        on_page_count(1)
+        record_page("native")
+        with source.buffer() as view:
+            yield 1, str(view, 'utf-8')
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+def process_document(source: DocumentSource, file_type: str, document_type: str = "default",
+                     progress: Optional[ProgressReporter] = None,
+                     page_index: Optional[PageHashIndex] = None) -> Tuple[List[Dict], Dict, Dict]:
+    """Process document and extract per-page text and key-value pairs.
+
+    Returns the pages ({"page", "text", "fields"} each), the key-value pairs
+    merged over all pages and the page each value came from. Page progress
+    is published through `progress` when one is given.
+    """
+    try:
+        accumulator = KeyValueAccumulator(document_type)
+        pages = []
+        on_page_count = progress.start if progress else None
+        for page_number, page_text in iter_page_texts(source, file_type, on_page_count, page_index):
+            with STAGE_SECONDS.time(stage="extract"):
+                fields = accumulator.feed(page_text, page_number)
+            pages.append({"page": page_number, "text": page_text, "fields": fields})
+            if progress:
+                progress.advance(page_number)
+        return pages, accumulator.pairs, accumulator.provenance
     except Exception as e:
         logger.error(f"Error processing document: {e}")
         raise
 
-def extract_key_value_pairs(text: str) -> Dict:
-    """Extract key-value pairs from text using simple pattern matching"""
-    # This is a simple implementation - you might want to use more sophisticated NLP techniques
-    # or template matching for specific document types
-    pairs = {}
-    
-    # Common patterns
-    patterns = [
-        (r'([A-Z][a-zA-Z\s]+):\s*(.+)', 'colon separated'),
-        (r'([A-Z][a-zA-Z\s]+)\s*=\s*(.+)', 'equals separated'),
-        (r'(?<=\n)([A-Z][a-zA-Z\s]+)\s+([^\n]+)', 'line separated'),
-    ]
-    
-    import re
-    for pattern, _ in patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            key = match[0].strip()
-            value = match[1].strip()
-            if key and value:
-                pairs[key] = value
-    
-    # Try to extract dates, amounts, etc.
-    date_matches = re.findall(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', text)
-    if date_matches:
-        pairs['extracted_dates'] = date_matches
-        
-    amount_matches = re.findall(r'(\$\d+\.\d{2})', text)
-    if amount_matches:
-        pairs['extracted_amounts'] = amount_matches
-    
-    return pairs
\ No newline at end of file
+def extract_key_value_pairs(text: str, document_type: str = "default") -> Dict:
+    """Extract key-value pairs, dates and amounts from text (see kv_extraction)"""
+    return extract_pairs(text, document_type)
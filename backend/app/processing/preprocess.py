@@ -0,0 +1,191 @@
+import logging
+import statistics
+from typing import Dict, List, Optional
+from PIL import Image, ImageOps
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Resolution of the cheap render used to measure text before the real one
+PROBE_DPI = 100
+
+COLOR_MODES = ("color", "grayscale", "binary")
+DPI_MODES = ("fixed", "auto")
+
+class PreprocessOptions:
+    """How pages are rendered and cleaned up before OCR"""
+
+    def __init__(self, dpi: int = 300, dpi_mode: str = "fixed", min_dpi: int = 150,
+                 target_line_height: int = 40, max_page_pixels: int = 2480 * 3508,
+                 color_mode: str = "color", deskew: bool = False, deskew_max_angle: float = 5.0,
+                 crop_margins: bool = False):
+        if dpi_mode not in DPI_MODES:
+            raise ValueError(f"Unknown DPI mode: {dpi_mode}")
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Unknown color mode: {color_mode}")
+        self.dpi = dpi
+        self.dpi_mode = dpi_mode
+        self.min_dpi = min_dpi
+        self.target_line_height = target_line_height
+        self.max_page_pixels = max_page_pixels
+        self.color_mode = color_mode
+        self.deskew = deskew
+        self.deskew_max_angle = deskew_max_angle
+        self.crop_margins = crop_margins
+
+    @classmethod
+    def from_settings(cls) -> "PreprocessOptions":
+        return cls(
+            dpi=settings.ocr_dpi,
+            dpi_mode=settings.ocr_dpi_mode,
+            min_dpi=settings.ocr_min_dpi,
+            target_line_height=settings.ocr_target_line_height,
+            max_page_pixels=settings.ocr_max_page_pixels,
+            color_mode=settings.ocr_color_mode,
+            deskew=settings.ocr_deskew,
+            deskew_max_angle=settings.ocr_deskew_max_angle,
+            crop_margins=settings.ocr_crop_margins,
+        )
+
+    def key(self) -> str:
+        """Identify the options for result caching"""
+        parts = [f"{self.dpi}dpi", self.color_mode]
+        if self.dpi_mode == "auto":
+            parts.append(f"auto{self.min_dpi}-{self.target_line_height}px-{self.max_page_pixels}")
+        if self.deskew:
+            parts.append(f"deskew{self.deskew_max_angle:g}")
+        if self.crop_margins:
+            parts.append("crop")
+        return "-".join(parts)
+
+# Named presets for comparing speed and accuracy (see benchmarks/bench_preprocess.py)
+PRESETS: Dict[str, PreprocessOptions] = {
+    "baseline": PreprocessOptions(),
+    "grayscale": PreprocessOptions(color_mode="grayscale"),
+    "gray_200dpi": PreprocessOptions(dpi=200, color_mode="grayscale"),
+    "fast": PreprocessOptions(dpi_mode="auto", color_mode="binary", crop_margins=True),
+    "accurate": PreprocessOptions(dpi_mode="auto", color_mode="grayscale", deskew=True, crop_margins=True),
+}
+
+def otsu_threshold(gray: Image.Image) -> int:
+    """Grey level that best separates ink from paper (Otsu's method)"""
+    histogram = gray.histogram()[:256]
+    total = sum(histogram)
+    total_sum = sum(level * count for level, count in enumerate(histogram))
+    background_count = 0
+    background_sum = 0
+    best_level, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        background_count += count
+        if background_count == 0:
+            continue
+        foreground_count = total - background_count
+        if foreground_count == 0:
+            break
+        background_sum += level * count
+        background_mean = background_sum / background_count
+        foreground_mean = (total_sum - background_sum) / foreground_count
+        variance = background_count * foreground_count * (background_mean - foreground_mean) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+def binarize(gray: Image.Image) -> Image.Image:
+    """Black text on white at the Otsu threshold"""
+    threshold = otsu_threshold(gray)
+    return gray.point([255 if level > threshold else 0 for level in range(256)], mode="1")
+
+def _row_darkness(binary: Image.Image) -> List[float]:
+    # Averaging each row down to one pixel gives the projection profile
+    # without touching pixels from Python
+    profile = binary.convert("L").resize((1, binary.height), Image.BOX)
+    return [255 - value for value in profile.getdata()]
+
+def estimate_line_height(gray: Image.Image) -> Optional[float]:
+    """Median height in pixels of the text lines on a page, None if it has none"""
+    darkness = _row_darkness(binarize(gray))
+    runs = []
+    run = 0
+    for value in darkness:
+        # A row belongs to a line when at least 0.2% of it is ink
+        if value > 0.5:
+            run += 1
+        elif run:
+            runs.append(run)
+            run = 0
+    if run:
+        runs.append(run)
+    runs = [run for run in runs if run >= 2]
+    return statistics.median(runs) if runs else None
+
+def choose_dpi(probe: Image.Image, probe_dpi: int, options: PreprocessOptions) -> int:
+    """Pick the rendering DPI of a page from a low-resolution render of it.
+
+    Scales the text so lines come out about target_line_height pixels tall,
+    within [min_dpi, dpi], and caps the page at max_page_pixels.
+    """
+    dpi = options.dpi
+    line_height = estimate_line_height(probe.convert("L"))
+    if line_height:
+        dpi = probe_dpi * options.target_line_height / line_height
+    width_inches = probe.width / probe_dpi
+    height_inches = probe.height / probe_dpi
+    dpi = min(dpi, (options.max_page_pixels / (width_inches * height_inches)) ** 0.5)
+    dpi = max(options.min_dpi, min(options.dpi, dpi))
+    return int(round(dpi / 10) * 10)
+
+def _profile_score(binary: Image.Image, angle: float) -> float:
+    rotated = binary.rotate(angle, resample=Image.NEAREST, fillcolor=255)
+    darkness = _row_darkness(rotated)
+    # Text lines aligned with the rows give the sharpest profile
+    return sum((a - b) ** 2 for a, b in zip(darkness, darkness[1:]))
+
+def find_skew(gray: Image.Image, max_angle: float = 5.0) -> float:
+    """Rotation in degrees that makes text lines horizontal (projection profile)"""
+    # Work on a small binary copy; the angle does not depend on resolution
+    scale = min(1.0, 1000 / max(gray.size))
+    small = gray.resize((max(int(gray.width * scale), 1), max(int(gray.height * scale), 1)), Image.BILINEAR)
+    binary = binarize(small).convert("L")
+
+    def best(angles):
+        return max(angles, key=lambda angle: _profile_score(binary, angle))
+
+    coarse = best([step * 0.5 for step in range(int(-max_angle * 2), int(max_angle * 2) + 1)])
+    return best([coarse + step * 0.1 for step in range(-4, 5)])
+
+def crop_margins(image: Image.Image, gray: Image.Image, padding: int = 20) -> Image.Image:
+    """Crop to the inked area plus some padding"""
+    ink = ImageOps.invert(gray).point([255 if level > 64 else 0 for level in range(256)])
+    box = ink.getbbox()
+    if box is None:
+        return image
+    left, top, right, bottom = box
+    return image.crop((
+        max(left - padding, 0), max(top - padding, 0),
+        min(right + padding, image.width), min(bottom + padding, image.height)
+    ))
+
+def preprocess_image(image: Image.Image, options: PreprocessOptions) -> Image.Image:
+    """Deskew, crop and reduce the colour depth of a page before OCR"""
+    try:
+        if options.color_mode == "color" and not (options.deskew or options.crop_margins):
+            return image
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("RGB")
+        gray = image if image.mode == "L" else image.convert("L")
+        working = image if options.color_mode == "color" else gray
+        if options.deskew:
+            angle = find_skew(gray, options.deskew_max_angle)
+            if abs(angle) >= 0.1:
+                fill = 255 if working.mode == "L" else "white"
+                working = working.rotate(angle, resample=Image.BICUBIC, fillcolor=fill)
+                gray = working if working.mode == "L" else working.convert("L")
+        if options.crop_margins:
+            working = crop_margins(working, gray)
+            gray = working if working.mode == "L" else working.convert("L")
+        if options.color_mode == "binary":
+            working = binarize(gray)
+        return working
+    except Exception as e:
+        logger.error(f"Error preprocessing image: {e}")
+        raise
@@ -0,0 +1,52 @@
+import logging
+import time
+from bson import ObjectId
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProgressReporter:
+    """Publishes page-level progress of a document to MongoDB.
+
+    Writes are coalesced: the document is updated at most once every
+    `min_pages` pages or `min_interval_ms` milliseconds, whichever comes
+    first, plus once at the start and once at the end.
+    """
+
+    def __init__(self, db, document_id: str, min_pages: int = None, min_interval_ms: int = None):
+        self.db = db
+        self.document_id = document_id
+        self.min_pages = min_pages or settings.progress_flush_pages
+        self.min_interval = (min_interval_ms or settings.progress_flush_interval_ms) / 1000
+        self.total_pages = 0
+        self.processed_pages = 0
+        self._written_pages = 0
+        self._written_at = 0.0
+
+    def start(self, total_pages: int):
+        """Record how many pages the document has"""
+        self.total_pages = total_pages
+        self.flush()
+
+    def advance(self, page: int):
+        """Record that `page` pages are done"""
+        self.processed_pages = page
+        if (self.processed_pages - self._written_pages >= self.min_pages
+                or time.monotonic() - self._written_at >= self.min_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the current progress now"""
+        try:
+            self.db["documents"].update_one(
+                {"_id": ObjectId(self.document_id)},
+                {"$set": {
+                    "processed_pages": self.processed_pages,
+                    "total_pages": self.total_pages,
+                }}
+            )
+        except Exception as e:
+            # Progress is informational; never fail the job over it
+            logger.error(f"Error writing progress for document {self.document_id}: {e}")
+        self._written_pages = self.processed_pages
+        self._written_at = time.monotonic()
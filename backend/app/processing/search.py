@@ -0,0 +1,83 @@
+import re
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, TEXT
+from app.core.config import settings
+from app.processing.texts import DOCUMENT_TEXTS_COLLECTION
+
+# Extracted key/value pairs are stored on each document as a flat list of
+# normalized {"k": key, "v": value} entries so one multikey index serves
+# exact lookups by field, by value or by both
+SEARCH_FIELDS = "search_fields"
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+AMOUNT_PATTERN = re.compile(r"^[$€£]?\s*\d[\d,]*(?:\.\d+)?$")
+TERM_PATTERN = re.compile(r'"([^"]+)"|(-?\S+)')
+
+def normalize_key(key: str) -> str:
+    """'Invoice Number' and 'invoice_number' both become 'invoice_number'"""
+    return NON_WORD_PATTERN.sub("_", key.lower()).strip("_")
+
+def normalize_value(value: Any) -> str:
+    """Case- and spacing-insensitive form of a value; amounts lose $ and commas"""
+    value = " ".join(str(value).lower().split())
+    if AMOUNT_PATTERN.match(value):
+        value = value.lstrip("$€£ ").replace(",", "")
+    return value
+
+def build_search_fields(key_value_pairs: Dict) -> List[Dict]:
+    """Index entries for a document's extracted key/value pairs"""
+    entries = []
+    seen = set()
+    for key, value in key_value_pairs.items():
+        normalized_key = normalize_key(key)
+        for item in value if isinstance(value, list) else [value]:
+            entry = (normalized_key, normalize_value(item))
+            if entry[1] and entry not in seen:
+                seen.add(entry)
+                entries.append({"k": entry[0], "v": entry[1]})
+    return entries
+
+def field_query(field: Optional[str], value: Optional[str]) -> Dict:
+    """Documents query matching a normalized field and/or value"""
+    match = {}
+    if field is not None:
+        match["k"] = normalize_key(field)
+    if value is not None:
+        match["v"] = normalize_value(value)
+    return {SEARCH_FIELDS: {"$elemMatch": match}}
+
+def search_terms(query: str) -> List[str]:
+    """Words and quoted phrases of a $text search string, without negations"""
+    terms = []
+    for phrase, word in TERM_PATTERN.findall(query):
+        term = phrase or word
+        if term and not term.startswith("-"):
+            terms.append(term)
+    return terms
+
+def make_snippet(text: str, terms: List[str], width: Optional[int] = None) -> str:
+    """A window of text around the first occurrence of any search term"""
+    width = width or settings.search_snippet_chars
+    lowered = text.lower()
+    positions = [position for position in (lowered.find(term.lower()) for term in terms) if position >= 0]
+    # Stemmed matches may not appear verbatim; fall back to the page start
+    center = min(positions) if positions else 0
+    start = max(center - width // 2, 0)
+    end = min(start + width, len(text))
+    snippet = " ".join(text[start:end].split())
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet += "…"
+    return snippet
+
+async def create_search_indexes(db):
+    """Per-owner text index on page texts and indexes on the normalized fields"""
+    await db[DOCUMENT_TEXTS_COLLECTION].create_index(
+        [("owner_id", ASCENDING), ("text", TEXT)],
+        default_language=settings.search_language
+    )
+    await db["documents"].create_index(
+        [("owner_id", ASCENDING), (f"{SEARCH_FIELDS}.k", ASCENDING), (f"{SEARCH_FIELDS}.v", ASCENDING)]
+    )
+    await db["documents"].create_index([("owner_id", ASCENDING), (f"{SEARCH_FIELDS}.v", ASCENDING)])
@@ -0,0 +1,83 @@
+import mmap
+import os
+from pathlib import Path
+from typing import Optional, Union
+from app.utils.file_handling import save_temp_file, cleanup_temp_file
+
+class DocumentSource:
+    """A document's content, opened once and shared by every processing stage.
+
+    Backed by a file path (memory-mapped on first access) or by bytes
+    already in memory. Stages take what they need without copying:
+    buffer() for decoding, head() for sniffing and file_path() for tools
+    such as pdftoppm that want a file on disk.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, data: Optional[bytes] = None,
+                 content_type: Optional[str] = None):
+        if (path is None) == (data is None):
+            raise ValueError("DocumentSource needs exactly one of path or data")
+        self.path = str(path) if path is not None else None
+        self.content_type = content_type
+        self._data = data
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._temp_path: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path], content_type: Optional[str] = None) -> "DocumentSource":
+        return cls(path=path, content_type=content_type)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, content_type: Optional[str] = None) -> "DocumentSource":
+        return cls(data=data, content_type=content_type)
+
+    @property
+    def size(self) -> int:
+        if self._data is not None:
+            return len(self._data)
+        return os.path.getsize(self.path)
+
+    def buffer(self) -> memoryview:
+        """Zero-copy view of the whole document"""
+        if self._data is not None:
+            return memoryview(self._data)
+        if self._mmap is None:
+            if self.size == 0:
+                # mmap cannot map empty files
+                return memoryview(b"")
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def head(self, length: int) -> bytes:
+        """The first `length` bytes, e.g. for type sniffing"""
+        if self._data is None and self._mmap is None:
+            with open(self.path, "rb") as f:
+                return f.read(length)
+        return bytes(self.buffer()[:length])
+
+    def file_path(self) -> str:
+        """A path to the content on disk, written out only for in-memory sources"""
+        if self.path is not None:
+            return self.path
+        if self._temp_path is None:
+            self._temp_path = save_temp_file(self._data, self.content_type)
+        return self._temp_path
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            cleanup_temp_file(self._temp_path)
+            self._temp_path = None
+
+    def __enter__(self) -> "DocumentSource":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,66 @@
+import logging
+import zipfile
+from typing import Iterator, List, Optional
+from xml.etree import ElementTree
+from pypdf import PdfReader
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def pdf_text_layer(pdf_path: str) -> List[Optional[str]]:
+    """Embedded text of each page of a PDF.
+
+    Returns one entry per page: the page's text when it has a usable text
+    layer (at least text_layer_min_chars non-blank characters), or None
+    when the page is image-only and has to be OCRed.
+    """
+    try:
+        reader = PdfReader(pdf_path)
+        texts = []
+        for page in reader.pages:
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                # A broken content stream only costs us the fast path for this page
+                logger.warning(f"Could not read text layer of page {len(texts) + 1} in {pdf_path}: {e}")
+                text = ""
+            if len("".join(text.split())) >= settings.text_layer_min_chars:
+                texts.append(text)
+            else:
+                texts.append(None)
+        return texts
+    except Exception as e:
+        logger.error(f"Error reading PDF text layer: {e}")
+        raise
+
+# WordprocessingML elements, in ElementTree's {namespace}tag form
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PARAGRAPH = W + "p"
+TEXT = W + "t"
+TAB = W + "tab"
+BREAKS = (W + "br", W + "cr")
+
+def iter_docx_paragraphs(docx_path: str) -> Iterator[str]:
+    """Yield the text of each paragraph in a .docx file's main document part.
+
+    word/document.xml is parsed incrementally straight out of the archive
+    and every paragraph is discarded once yielded, so memory stays flat
+    however large the document is.
+    """
+    try:
+        with zipfile.ZipFile(docx_path) as archive:
+            with archive.open("word/document.xml") as document:
+                parts = []
+                for event, element in ElementTree.iterparse(document, events=("end",)):
+                    if element.tag == TEXT:
+                        parts.append(element.text or "")
+                    elif element.tag == TAB:
+                        parts.append("\t")
+                    elif element.tag in BREAKS:
+                        parts.append("\n")
+                    elif element.tag == PARAGRAPH:
+                        yield "".join(parts)
+                        parts = []
+                        element.clear()
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Not a valid .docx file: {e}")
@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, List, Tuple
+from pymongo import ASCENDING
+
+logger = logging.getLogger(__name__)
+
+# Page texts live outside the documents collection so listing and status
+# reads never drag OCR output through the cache
+DOCUMENT_TEXTS_COLLECTION = "document_texts"
+
+def split_extracted_data(extracted_data: Dict) -> Tuple[Dict, List[Dict]]:
+    """Separate the bulky page texts from the rest of extracted_data.
+
+    Returns the data to keep on the document record (per-page fields and
+    text length, no text) and the text of each page.
+    """
+    pages = extracted_data.get("pages")
+    if pages is None:
+        # Results produced before per-page extraction only carry full_text
+        pages = [{"page": 1, "text": extracted_data.get("full_text", ""), "fields": {}}]
+    texts = [{"page": page["page"], "text": page["text"]} for page in pages]
+    summary = {key: value for key, value in extracted_data.items() if key not in ("full_text", "pages")}
+    summary["pages"] = [
+        {"page": page["page"], "fields": page["fields"], "text_length": len(page["text"])}
+        for page in pages
+    ]
+    return summary, texts
+
+def _text_records(document_id: str, owner_id: str, texts: List[Dict]) -> List[Dict]:
+    return [
+        {"document_id": document_id, "owner_id": owner_id, "page": text["page"], "text": text["text"]}
+        for text in texts
+    ]
+
+def store_texts_sync(db, document_id: str, owner_id: str, texts: List[Dict]):
+    """Replace the stored page texts of a document (blocking)"""
+    collection = db[DOCUMENT_TEXTS_COLLECTION]
+    collection.delete_many({"document_id": document_id})
+    if texts:
+        collection.insert_many(_text_records(document_id, owner_id, texts), ordered=False)
+
+async def store_texts(db, document_id: str, owner_id: str, texts: List[Dict]):
+    """Replace the stored page texts of a document"""
+    collection = db[DOCUMENT_TEXTS_COLLECTION]
+    await collection.delete_many({"document_id": document_id})
+    if texts:
+        await collection.insert_many(_text_records(document_id, owner_id, texts), ordered=False)
+
+async def create_text_indexes(db):
+    await db[DOCUMENT_TEXTS_COLLECTION].create_index(
+        [("document_id", ASCENDING), ("page", ASCENDING)], unique=True
+    )
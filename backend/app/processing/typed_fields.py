@@ -0,0 +1,153 @@
+import re
+from datetime import datetime
+from decimal import Decimal, DecimalException, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+from bson.decimal128 import Decimal128
+from pymongo import ASCENDING
+from app.core.config import settings
+
+# Extracted dates and amounts are stored on each document as a typed array
+# alongside the raw strings:
+#   {"kind": "date", "value": datetime, "page": 1}
+#   {"kind": "amount", "value": Decimal128, "currency": "USD", "page": 2}
+TYPED_FIELDS = "typed_fields"
+
+# The forms kv_extraction.VALUE_PATTERN extracts
+DATE_PATTERN = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})$")
+AMOUNT_PATTERN = re.compile(r"^\$(?P<number>\d+\.\d{2})$")
+
+def parse_date(text: str) -> Optional[datetime]:
+    """Parse an extracted date such as 3/4/24 or 03-04-2024 (order per settings.date_order)"""
+    match = DATE_PATTERN.match(text.strip())
+    if not match:
+        return None
+    first, second, year = (int(part) for part in match.groups())
+    month, day = (first, second) if settings.date_order == "MDY" else (second, first)
+    if len(match.group(3)) == 2:
+        # Two-digit years: 00-69 are 20xx, 70-99 are 19xx
+        year += 2000 if year < 70 else 1900
+    elif len(match.group(3)) == 3:
+        return None
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+def parse_amount(text: str) -> Optional[Tuple[Decimal, str]]:
+    """Parse an extracted amount such as $1200.00 into (value, ISO currency code).
+
+    Extraction only picks up "$" amounts; their currency is
+    settings.default_currency.
+    """
+    match = AMOUNT_PATTERN.match(text.strip())
+    if not match:
+        return None
+    try:
+        return Decimal(match.group("number")), settings.default_currency
+    except InvalidOperation:
+        return None
+
+def to_decimal128(value: Decimal) -> Optional[Decimal128]:
+    """value as a BSON Decimal128, None if it does not fit (more than 34 significant digits)"""
+    try:
+        return Decimal128(value)
+    except DecimalException:
+        return None
+
+def build_typed_fields(key_value_pairs: Dict, provenance: Optional[Dict] = None) -> List[Dict]:
+    """Typed date and amount entries for a document's extracted values.
+
+    Values that cannot be parsed (e.g. 13/13/2024) or stored (an OCR misread
+    with 40 digits) are left out; the raw strings stay in extracted_data
+    either way.
+    """
+    provenance = provenance or {}
+    entries = []
+    dates = key_value_pairs.get("extracted_dates", [])
+    date_pages = provenance.get("extracted_dates", [])
+    for i, text in enumerate(dates):
+        value = parse_date(text)
+        if value is not None:
+            entry = {"kind": "date", "value": value}
+            if i < len(date_pages):
+                entry["page"] = date_pages[i]
+            entries.append(entry)
+    amounts = key_value_pairs.get("extracted_amounts", [])
+    amount_pages = provenance.get("extracted_amounts", [])
+    for i, text in enumerate(amounts):
+        parsed = parse_amount(text)
+        value = to_decimal128(parsed[0]) if parsed is not None else None
+        if value is not None:
+            entry = {"kind": "amount", "value": value, "currency": parsed[1]}
+            if i < len(amount_pages):
+                entry["page"] = amount_pages[i]
+            entries.append(entry)
+    return entries
+
+def range_query(kind: str, low=None, high=None, currency: Optional[str] = None) -> Dict:
+    """Documents query for a typed value of `kind` within [low, high]"""
+    match = {"kind": kind}
+    bounds = {}
+    if low is not None:
+        bounds["$gte"] = low
+    if high is not None:
+        bounds["$lte"] = high
+    if bounds:
+        match["value"] = bounds
+    if currency is not None:
+        match["currency"] = currency
+    elif kind == "date":
+        # Dates have no currency; matching the missing field keeps the
+        # index bounds on (kind, currency, value) tight
+        match["currency"] = None
+    return {TYPED_FIELDS: {"$elemMatch": match}}
+
+def monthly_totals_pipeline(owner_id: str, currency: str, date_from: Optional[datetime] = None,
+                            date_to: Optional[datetime] = None) -> List[Dict]:
+    """Aggregation summing each document's total per calendar month.
+
+    A document's total is its largest amount in `currency` (the grand total
+    on an invoice or receipt, rather than every line, subtotal and tax) and
+    its month is that of its first extracted date, or of its upload date if
+    it has none.
+    """
+    def typed(kind, extra=None):
+        conditions = [{"$eq": ["$$field.kind", kind]}] + (extra or [])
+        return {"$filter": {"input": f"${TYPED_FIELDS}", "as": "field", "cond": {"$and": conditions}}}
+
+    pipeline = [
+        {"$match": {"owner_id": owner_id, **range_query("amount", currency=currency)}},
+        {"$project": {
+            "total": {"$max": {"$map": {
+                "input": typed("amount", [{"$eq": ["$$field.currency", currency]}]),
+                "as": "field", "in": "$$field.value"
+            }}},
+            "date": {"$ifNull": [
+                {"$arrayElemAt": [{"$map": {"input": typed("date"), "as": "field", "in": "$$field.value"}}, 0]},
+                "$upload_date"
+            ]},
+        }},
+    ]
+    bounds = {}
+    if date_from is not None:
+        bounds["$gte"] = date_from
+    if date_to is not None:
+        bounds["$lte"] = date_to
+    if bounds:
+        pipeline.append({"$match": {"date": bounds}})
+    pipeline += [
+        {"$group": {
+            "_id": {"year": {"$year": "$date"}, "month": {"$month": "$date"}},
+            "total": {"$sum": "$total"},
+            "documents": {"$sum": 1},
+        }},
+        {"$sort": {"_id.year": 1, "_id.month": 1}},
+    ]
+    return pipeline
+
+async def create_typed_field_indexes(db):
+    """Range scans on typed values within one owner's documents"""
+    await db["documents"].create_index([
+        ("owner_id", ASCENDING), (f"{TYPED_FIELDS}.kind", ASCENDING),
+        (f"{TYPED_FIELDS}.currency", ASCENDING), (f"{TYPED_FIELDS}.value", ASCENDING)
+    ])
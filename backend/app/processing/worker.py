@@ -0,0 +1,240 @@
+"""Worker pool that drains the document processing queue.
+
+Run alongside the API with:
+
+    python -m app.processing.worker [--processes N]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import zipfile
+from typing import Dict, Optional
+from bson import ObjectId
+from pdf2image.exceptions import PDFPageCountError, PDFSyntaxError
+from PIL import UnidentifiedImageError
+from pypdf.errors import PdfReadError
+from app.core.config import settings
+from app.core.database import get_sync_database
+from app.core.metrics import JOBS_IN_FLIGHT, JOBS_TOTAL, STAGE_SECONDS, watch_cache
+from app.models.document import DocumentStatus
+from app.processing.cache import record_engine_version, result_cache
+from app.processing.duplicates import PageHashIndex
+from app.processing import ocr
+from app.processing.extractor import run_extraction
+from app.processing.jobs import JOBS_COLLECTION, JobQueue, PermanentJobError
+from app.processing.progress import ProgressReporter
+from app.processing.search import build_search_fields
+from app.processing.source import DocumentSource
+from app.processing.typed_fields import build_typed_fields
+from app.processing.texts import split_extracted_data, store_texts_sync
+from app.utils.file_handling import open_document_file
+from app.utils.metrics import start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# How often an idle worker checks for expired leases with no retries left
+REAP_INTERVAL_SECONDS = 30
+
+# Raised by extraction for files that will never process (unsupported type,
+# corrupt PDF, image or docx); anything else is assumed transient and retried
+PERMANENT_ERRORS = (ValueError, UnidentifiedImageError, PDFPageCountError, PDFSyntaxError,
+                    PdfReadError, zipfile.BadZipFile)
+
+class LeaseKeeper(threading.Thread):
+    """Keeps a job's lease alive while it is being processed"""
+
+    def __init__(self, queue: JobQueue, job: Dict):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job = job
+        self.interval = max(queue.lease_seconds / 3, 1)
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.job):
+                    logger.warning(f"Lost lease on job {self.job['_id']}")
+                    return
+            except Exception as e:
+                logger.error(f"Error extending lease on job {self.job['_id']}: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+def set_document_status(db, document_id: str, status: DocumentStatus, **fields):
+    fields["status"] = status.value
+    db["documents"].update_one({"_id": ObjectId(document_id)}, {"$set": fields})
+
+def process_job(db, job: Dict):
+    """Run OCR and extraction for a single claimed job"""
+    document_id = job["document_id"]
+    set_document_status(db, document_id, DocumentStatus.PROCESSING)
+    owner_id = job.get("owner_id")
+    if owner_id is None:
+        document = db["documents"].find_one({"_id": ObjectId(document_id)}, {"owner_id": 1})
+        if document is None:
+            raise PermanentJobError(f"Document {document_id} no longer exists")
+        owner_id = document["owner_id"]
+
+    content_hash = job.get("content_hash")
+    extracted_data = None
+    if content_hash and settings.result_cache_enabled:
+        # An identical file may have finished while this job was queued
+        extracted_data = result_cache.get_sync(db, content_hash)
+    if extracted_data is None:
+        # Open the stored file once; stages share it without copying
+        with open_document_file(document_id) as path, \
+                DocumentSource.from_path(path, job["content_type"]) as source:
+            progress = ProgressReporter(db, document_id)
+            page_index = None
+            if settings.duplicate_detection_enabled:
+                page_index = PageHashIndex(owner_id, document_id)
+                # A retried job starts over
+                page_index.clear()
+            try:
+                extracted_data = run_extraction(source, job["content_type"], progress, page_index)
+            except PERMANENT_ERRORS as e:
+                raise PermanentJobError(str(e)) from e
+        if content_hash and settings.result_cache_enabled:
+            result_cache.put_sync(db, content_hash, extracted_data)
+
+    # Page texts go to their own collection; the record keeps fields and metadata
+    with STAGE_SECONDS.time(stage="persist"):
+        summary, texts = split_extracted_data(extracted_data)
+        store_texts_sync(db, document_id, owner_id, texts)
+
+        set_document_status(
+            db, document_id, DocumentStatus.COMPLETED,
+            extracted_data=summary,
+            search_fields=build_search_fields(summary.get("key_value_pairs", {})),
+            typed_fields=build_typed_fields(summary.get("key_value_pairs", {}), summary.get("provenance")),
+            processed_pages=extracted_data["metadata"]["pages_processed"],
+            total_pages=extracted_data["metadata"]["pages_processed"]
+        )
+
+def run_one(db, queue: JobQueue, worker_id: str) -> bool:
+    """Claim and process one job. Returns False if the queue was empty."""
+    job = queue.claim(worker_id)
+    if job is None:
+        return False
+
+    logger.info(f"{worker_id} processing document {job['document_id']} (attempt {job['attempts']})")
+    keeper = LeaseKeeper(queue, job)
+    keeper.start()
+    try:
+        with JOBS_IN_FLIGHT.track_inprogress(), STAGE_SECONDS.time(stage="job"):
+            process_job(db, job)
+    except Exception as e:
+        logger.error(f"Error processing document {job['document_id']}: {e}")
+        if queue.fail(job, str(e), retryable=not isinstance(e, PermanentJobError)):
+            JOBS_TOTAL.inc(outcome="retried")
+            set_document_status(db, job["document_id"], DocumentStatus.UPLOADED)
+        else:
+            JOBS_TOTAL.inc(outcome="failed")
+            set_document_status(db, job["document_id"], DocumentStatus.FAILED)
+    else:
+        JOBS_TOTAL.inc(outcome="succeeded")
+        queue.complete(job)
+    finally:
+        keeper.stop()
+    return True
+
+def publish_engine_version(db):
+    """Tell the API which OCR engine version cached results come from"""
+    try:
+        record_engine_version(db)
+    except Exception as e:
+        logger.error(f"Error recording the OCR engine version: {e}")
+
+def worker_main(worker_id: str, stop_event, metrics_port: Optional[int] = None, core_slots=None):
+    """Entry point of a single worker process"""
+    # Caps Tesseract's OpenMP threads on the serial path too; page pool
+    # processes inherit it
+    os.environ["OMP_THREAD_LIMIT"] = str(settings.ocr_tesseract_threads)
+    ocr.set_core_slots(core_slots)
+
+    # Let the supervisor decide when to stop; finish the current job on SIGINT/SIGTERM
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    if metrics_port:
+        watch_cache("result", result_cache.stats)
+        start_metrics_server(metrics_port)
+        logger.info(f"Worker {worker_id} serving metrics on port {metrics_port}")
+
+    db = get_sync_database()
+    queue = JobQueue(db[JOBS_COLLECTION])
+    last_reap = 0.0
+    publish_engine_version(db)
+    logger.info(f"Worker {worker_id} started")
+
+    while not stop_event.is_set():
+        try:
+            # A job runs on one slot of the host's cores; large scans borrow more
+            with ocr.core_slot():
+                claimed = run_one(db, queue, worker_id)
+            if claimed:
+                continue
+            # Idle page processes only hold memory; they restart on demand
+            ocr.shutdown_page_pool()
+            if time.monotonic() - last_reap > REAP_INTERVAL_SECONDS:
+                last_reap = time.monotonic()
+                publish_engine_version(db)
+                for job in queue.reap_abandoned():
+                    set_document_status(db, job["document_id"], DocumentStatus.FAILED)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} error: {e}")
+        stop_event.wait(settings.job_poll_interval_seconds)
+
+    logger.info(f"Worker {worker_id} stopped")
+
+def run_worker_pool(processes: Optional[int] = None):
+    """Start the worker processes and restart any that die until signalled"""
+    processes = processes or settings.worker_processes or os.cpu_count() or 1
+    # spawn, not fork: each worker must open its own MongoDB connection pool
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    # One pass over the host's cores for all workers and their page pools
+    core_slots = ctx.BoundedSemaphore(ocr.core_budget())
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(slot: int):
+        worker_id = f"{prefix}:{slot}"
+        # Each worker process exports its own metrics on consecutive ports
+        metrics_port = settings.worker_metrics_port + slot if settings.worker_metrics_port else None
+        process = ctx.Process(
+            target=worker_main, args=(worker_id, stop_event, metrics_port, core_slots), name=f"worker-{slot}"
+        )
+        process.start()
+        return process
+
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    workers = [start(slot) for slot in range(processes)]
+    logger.info(f"Started {processes} worker processes")
+
+    while not stop_event.is_set():
+        for slot, process in enumerate(workers):
+            if not process.is_alive():
+                # Its job, if any, is recovered by another worker once the lease expires
+                logger.warning(f"Worker {process.name} exited with code {process.exitcode}, restarting")
+                workers[slot] = start(slot)
+        stop_event.wait(1)
+
+    for process in workers:
+        process.join()
+    logger.info("Worker pool stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Document processing worker pool")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes (default: one per CPU core)")
+    args = parser.parse_args()
+    run_worker_pool(args.processes)
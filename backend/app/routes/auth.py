@@ -4,10 +4,13 @@ from datetime import timedelta
 from app.models.user import UserCreate, User
 from app.models.schemas import Token
 from app.core.security import (
-    get_password_hash,
+    get_password_hash_async,
     create_access_token,
-    verify_password,
-    get_current_user,
+    verify_password_async,
+    get_current_user_record,
+    invalidate_user,
+    oauth2_scheme,
+    revoke_token,
 )
 from app.core.config import settings
 from app.core.database import get_database
@@ -22,12 +25,13 @@ async def register(user: UserCreate):
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     user_dict = user.dict()
     user_dict["hashed_password"] = hashed_password
     del user_dict["password"]
     
     result = await db["users"].insert_one(user_dict)
+    invalidate_user(user.username)
     created_user = await db["users"].find_one({"_id": result.inserted_id})
     created_user["id"] = str(created_user["_id"])
     return created_user
@@ -36,7 +40,7 @@ async def register(user: UserCreate):
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     db = get_database()
     user = await db["users"].find_one({"username": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -50,10 +54,13 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: str = Depends(get_current_user)):
-    db = get_database()
-    user = await db["users"].find_one({"username": current_user})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    user["id"] = str(user["_id"])
-    return user
\ No newline at end of file
+async def read_users_me(current_user: dict = Depends(get_current_user_record)):
+    return current_user
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(get_current_user_record)
+):
+    await revoke_token(token)
+    invalidate_user(current_user["username"])
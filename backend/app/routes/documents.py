@@ -1,101 +1,475 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import List
-from app.models.document import Document, DocumentCreate, DocumentStatus, DocumentUpdate
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.models.document import (
+    BatchUploadResult, Document, DocumentCreate, DocumentStatus, DocumentText, DocumentUpdate, DuplicateCluster,
+    MonthlyTotal, SearchResults
+)
 from app.core.security import get_current_user
+from app.core.config import settings
 from app.core.database import get_database
-from app.processing.extractor import extract_document_data
-from app.utils.file_handling import save_document_file
+from app.core.metrics import STAGE_SECONDS
+from app.processing.cache import result_cache
+from app.processing.classifier import DocumentClassifier, routing_type
+from app.processing.duplicates import PAGE_HASHES_COLLECTION, duplicate_clusters
+from app.processing.jobs import enqueue_jobs, new_job
+from app.processing.search import SEARCH_FIELDS, build_search_fields, field_query, make_snippet, search_terms
+from app.processing.typed_fields import (
+    TYPED_FIELDS, build_typed_fields, monthly_totals_pipeline, range_query, to_decimal128
+)
+from app.processing.texts import DOCUMENT_TEXTS_COLLECTION, split_extracted_data, store_texts
+from app.utils.archives import open_archive
+from app.utils.file_handling import (
+    FileTooLargeError, delete_document_file, iter_file_chunks, iter_upload_chunks, peek_chunks, save_stream
+)
+from app.utils.helpers import decode_cursor, encode_cursor
 from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+import asyncio
+import json
 import logging
 
 router = APIRouter()
 
-@router.post("/documents/upload", response_model=Document)
-async def upload_document(
-    file: UploadFile = File(...),
-    current_user: str = Depends(get_current_user)
-):
-    db = get_database()
-    
+# Fields returned when listing documents; extracted data is fetched per document
+LIST_PROJECTION = {
+    "filename": 1,
+    "content_type": 1,
+    "size": 1,
+    "upload_date": 1,
+    "owner_id": 1,
+    "status": 1,
+    "processed_pages": 1,
+    "total_pages": 1,
+}
+
+# Newest first; _id breaks ties so the order is total and pages are stable
+LIST_SORT = [("upload_date", DESCENDING), ("_id", DESCENDING)]
+
+async def create_document_indexes(db):
+    """Compound indexes serving the (optionally filtered) document listing"""
+    await db["documents"].create_index([("owner_id", ASCENDING)] + LIST_SORT)
+    await db["documents"].create_index([("owner_id", ASCENDING), ("status", ASCENDING)] + LIST_SORT)
+    await db["documents"].create_index([("owner_id", ASCENDING), ("content_type", ASCENDING)] + LIST_SORT)
+
+async def ingest_document(
+    db,
+    owner_id: str,
+    filename: str,
+    content_type: str,
+    chunks: AsyncIterator[bytes]
+) -> Tuple[Dict, Optional[Dict]]:
+    """Stream one file to storage and build its document record.
+
+    Returns the record (not yet inserted) and the processing job to enqueue,
+    or None for the job when a cached result already completes the document.
+    The caller writes both, so batches can use a single insert_many.
+    """
+    document_id = ObjectId()
+    declared_type = content_type
     try:
-        # Read file content
-        file_data = await file.read()
+        # Route on the sniffed type rather than trusting the client's header
+        header, chunks = await peek_chunks(chunks, settings.classifier_header_bytes)
+        with STAGE_SECONDS.time(stage="classify"):
+            classification = DocumentClassifier.classify_document(header, filename)
+        content_type = routing_type(classification["type"], declared_type)
+        
+        # Stream the file to storage, hashing and measuring it on the way
+        size, content_hash = await save_stream(str(document_id), chunks, settings.max_upload_size)
         
         # Create document record
         document_data = DocumentCreate(
-            filename=file.filename,
-            content_type=file.content_type,
-            size=len(file_data),
+            filename=filename,
+            content_type=content_type,
+            size=size,
             upload_date=datetime.now()
         )
         
-        # Save to database
-        document_dict = document_data.dict()
-        document_dict["owner_id"] = current_user
-        document_dict["status"] = DocumentStatus.UPLOADED.value
-        
-        result = await db["documents"].insert_one(document_dict)
-        document_id = str(result.inserted_id)
+        # Identical bytes processed with the same OCR settings can reuse the result
+        cached_data = None
+        if settings.result_cache_enabled:
+            cached_data = await result_cache.get(db, content_hash)
         
-        # Save file to storage
-        await save_document_file(document_id, file_data)
+        document_dict = document_data.dict()
+        document_dict["_id"] = document_id
+        document_dict["owner_id"] = owner_id
+        document_dict["content_hash"] = content_hash
+        if declared_type != content_type:
+            document_dict["declared_content_type"] = declared_type
+        for key in ("filename_date", "filename_id"):
+            if key in classification:
+                document_dict[key] = classification[key]
+        if cached_data is not None:
+            pages = cached_data["metadata"]["pages_processed"]
+            summary, texts = split_extracted_data(cached_data)
+            await store_texts(db, str(document_id), owner_id, texts)
+            document_dict["status"] = DocumentStatus.COMPLETED.value
+            document_dict["extracted_data"] = summary
+            document_dict[SEARCH_FIELDS] = build_search_fields(summary.get("key_value_pairs", {}))
+            document_dict[TYPED_FIELDS] = build_typed_fields(
+                summary.get("key_value_pairs", {}), summary.get("provenance")
+            )
+            document_dict["processed_pages"] = pages
+            document_dict["total_pages"] = pages
+            return document_dict, None
         
-        # Start processing in background (in a real app, use Celery or similar)
-        await process_document_in_background(document_id, file_data, file.content_type)
+        document_dict["status"] = DocumentStatus.UPLOADED.value
+        # Processed by the worker pool (app/processing/worker.py)
+        return document_dict, new_job(str(document_id), content_type, content_hash, owner_id)
+    except Exception:
+        await delete_document_file(str(document_id))
+        raise
+
+@router.post("/documents/upload", response_model=Document)
+async def upload_document(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: str = Depends(get_current_user)
+):
+    db = get_database()
+    
+    # Reject oversized uploads up front when the client declares a length
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.max_upload_size:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+    
+    try:
+        document_dict, job = await ingest_document(
+            db, current_user, file.filename, file.content_type, iter_upload_chunks(file)
+        )
+        with STAGE_SECONDS.time(stage="persist"):
+            await db["documents"].insert_one(document_dict)
+            if job is not None:
+                await enqueue_jobs(db, [job])
         
-        # Return the created document
-        created_document = await db["documents"].find_one({"_id": result.inserted_id})
-        created_document["id"] = document_id
-        return created_document
+        # The record is already known; no need to read it back
+        document_dict["id"] = str(document_dict["_id"])
+        return document_dict
         
+    except FileTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
     except Exception as e:
         logging.error(f"Error uploading document: {e}")
         raise HTTPException(status_code=500, detail="Error uploading document")
 
-async def process_document_in_background(document_id: str, file_data: bytes, content_type: str):
+async def ingest_batch(db, owner_id: str, members: AsyncIterator[Tuple[str, str, AsyncIterator[bytes]]]) -> Dict:
+    """Ingest (filename, content_type, chunks) members and write them in bulk"""
+    items = []
+    records = []
+    record_items = []  # index in items of each record
+    jobs = []
+    async for filename, content_type, chunks in members:
+        if len(items) >= settings.max_batch_files:
+            items.append({"filename": filename, "error": f"More than {settings.max_batch_files} files"})
+            continue
+        try:
+            document_dict, job = await ingest_document(db, owner_id, filename, content_type, chunks)
+        except FileTooLargeError:
+            items.append({"filename": filename, "error": "File too large"})
+            continue
+        except Exception as e:
+            logging.error(f"Error uploading {filename}: {e}")
+            items.append({"filename": filename, "error": "Error uploading document"})
+            continue
+        records.append(document_dict)
+        record_items.append(len(items))
+        if job is not None:
+            jobs.append(job)
+        items.append({
+            "filename": filename,
+            "id": str(document_dict["_id"]),
+            "status": document_dict["status"],
+        })
+
+    uploaded = len(records)
+    if records:
+        with STAGE_SECONDS.time(stage="persist"):
+            try:
+                await db["documents"].insert_many(records, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: everything but the reported records was written
+                failed = sorted({error["index"] for error in e.details.get("writeErrors", [])})
+                logging.error(f"Error storing {len(failed)} of {len(records)} batch documents: {e}")
+                failed_ids = [str(records[index]["_id"]) for index in failed]
+                for index, document_id in zip(failed, failed_ids):
+                    item = items[record_items[index]]
+                    items[record_items[index]] = {"filename": item["filename"], "error": "Error uploading document"}
+                    await delete_document_file(document_id)
+                # Texts were already stored for cached results
+                await db[DOCUMENT_TEXTS_COLLECTION].delete_many({"document_id": {"$in": failed_ids}})
+                jobs = [job for job in jobs if job["document_id"] not in failed_ids]
+                uploaded -= len(failed)
+            await enqueue_jobs(db, jobs)
+
+    return {
+        "documents": items,
+        "uploaded": uploaded,
+        "failed": len(items) - uploaded,
+    }
+
+@router.post("/documents/upload/batch", response_model=BatchUploadResult)
+async def upload_documents(
+    files: List[UploadFile] = File(...),
+    current_user: str = Depends(get_current_user)
+):
+    """Upload several files in one request, with per-file ids and errors"""
+    db = get_database()
+
+    async def members():
+        for file in files:
+            yield file.filename, file.content_type, iter_upload_chunks(file)
+
+    return await ingest_batch(db, current_user, members())
+
+@router.post("/documents/upload/archive", response_model=BatchUploadResult)
+async def upload_archive(
+    file: UploadFile = File(...),
+    current_user: str = Depends(get_current_user)
+):
+    """Upload a zip or tar archive; each regular file in it becomes a document"""
     db = get_database()
+    await file.seek(0)
     try:
-        # Update status to processing
-        await db["documents"].update_one(
-            {"_id": ObjectId(document_id)},
-            {"$set": {"status": DocumentStatus.PROCESSING.value}}
-        )
-        
-        # Process the document
-        extracted_data = await extract_document_data(file_data, content_type)
-        
-        # Update document with results
-        await db["documents"].update_one(
-            {"_id": ObjectId(document_id)},
-            {"$set": {
-                "status": DocumentStatus.COMPLETED.value,
-                "extracted_data": extracted_data,
-                "processed_pages": extracted_data["metadata"]["pages_processed"],
-                "total_pages": extracted_data["metadata"]["pages_processed"]
-            }}
-        )
-        
-    except Exception as e:
-        logging.error(f"Error processing document {document_id}: {e}")
-        await db["documents"].update_one(
-            {"_id": ObjectId(document_id)},
-            {"$set": {"status": DocumentStatus.FAILED.value}}
-        )
+        archive = await run_in_threadpool(open_archive, file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def members():
+        with archive:
+            for name, content_type, member in archive:
+                with member:
+                    yield name, content_type, iter_file_chunks(member)
+
+    return await ingest_batch(db, current_user, members())
 
 @router.get("/", response_model=List[Document])
 async def get_user_documents(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    status_filter: Optional[DocumentStatus] = Query(None, alias="status"),
+    content_type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    amount_min: Optional[Decimal] = None,
+    amount_max: Optional[Decimal] = None,
+    currency: Optional[str] = Query(None, min_length=3, max_length=3),
     current_user: str = Depends(get_current_user)
 ):
+    """List documents newest first, one page at a time.
+
+    Pagination is keyset-based: pass the X-Next-Cursor header of one page as
+    `cursor` to get the next. Every page is an index range scan on
+    (owner_id, [status | content_type], upload_date, _id), so deep pages
+    cost the same as the first.
+
+    date_from/date_to and amount_min/amount_max/currency keep documents with
+    an extracted date or amount in range; those filters are served by the
+    typed_fields index instead.
+    """
     db = get_database()
+    query = {"owner_id": current_user}
+    if status_filter is not None:
+        query["status"] = status_filter.value
+    if content_type is not None:
+        query["content_type"] = content_type
+    typed_filters = []
+    if date_from is not None or date_to is not None:
+        typed_filters.append(range_query("date", date_from, date_to))
+    if amount_min is not None or amount_max is not None or currency is not None:
+        low = to_decimal128(amount_min) if amount_min is not None else None
+        high = to_decimal128(amount_max) if amount_max is not None else None
+        if (amount_min is not None and low is None) or (amount_max is not None and high is None):
+            raise HTTPException(status_code=422, detail="Amounts can have at most 34 significant digits")
+        typed_filters.append(range_query("amount", low, high, currency.upper() if currency is not None else None))
+    if typed_filters:
+        query["$and"] = typed_filters
+    if cursor is not None:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"upload_date": {"$lt": last_date}},
+            {"upload_date": last_date, "_id": {"$lt": last_id}},
+        ]
+
     documents = []
-    async for doc in db["documents"].find({"owner_id": current_user}).skip(skip).limit(limit):
+    results = db["documents"].find(query, LIST_PROJECTION).sort(LIST_SORT).limit(limit)
+    async for doc in results:
         doc["id"] = str(doc["_id"])
         documents.append(doc)
+
+    if len(documents) == limit:
+        last = documents[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["upload_date"], last["_id"])
     return documents
 
+@router.get("/documents/search", response_model=SearchResults)
+async def search_documents(
+    q: Optional[str] = Query(None, min_length=1),
+    field: Optional[str] = None,
+    value: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    current_user: str = Depends(get_current_user)
+):
+    """Search your documents by text and/or extracted fields.
+
+    `q` is a MongoDB $text query ("quoted phrases", -negations) over the
+    page texts; hits are ranked by relevance and carry a snippet of their
+    best page. `field` and `value` match extracted key/value pairs exactly
+    after normalization (case, spacing, $ and thousands separators), e.g.
+    field=invoice_number&value=INV-104233. Without `q`, field matches are
+    listed newest first. Pass `next_offset` back as `offset` for the next page.
+    """
+    if q is None and field is None and value is None:
+        raise HTTPException(status_code=400, detail="Give a query, a field or a value")
+    db = get_database()
+    owner = {"owner_id": current_user}
+    fields_filter = field_query(field, value) if field is not None or value is not None else None
+
+    if q is None:
+        hits = []
+        results = db["documents"].find({**owner, **fields_filter}, LIST_PROJECTION) \
+            .sort(LIST_SORT).skip(offset).limit(limit + 1)
+        async for doc in results:
+            doc["id"] = str(doc["_id"])
+            hits.append(doc)
+        more = len(hits) > limit
+        return {"hits": hits[:limit], "next_offset": offset + limit if more else None}
+
+    match = {**owner, "$text": {"$search": q}}
+    if fields_filter is not None:
+        matching_ids = db["documents"].find({**owner, **fields_filter}, {"_id": 1}) \
+            .limit(settings.search_max_field_matches)
+        match["document_id"] = {"$in": [str(doc["_id"]) async for doc in matching_ids]}
+    # Rank pages on the text index, then keep each document's best page;
+    # page texts are only read for the hits that are returned
+    pipeline = [
+        {"$match": match},
+        {"$project": {"document_id": 1, "page": 1, "score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1}},
+        {"$group": {"_id": "$document_id", "score": {"$first": "$score"}, "pages": {"$push": "$page"}}},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$skip": offset},
+        {"$limit": limit + 1},
+    ]
+    ranked = await db[DOCUMENT_TEXTS_COLLECTION].aggregate(pipeline).to_list(length=limit + 1)
+    more = len(ranked) > limit
+    ranked = ranked[:limit]
+    if not ranked:
+        return {"hits": [], "next_offset": None}
+
+    documents = {
+        str(doc["_id"]): doc async for doc in db["documents"].find(
+            {**owner, "_id": {"$in": [ObjectId(hit["_id"]) for hit in ranked]}}, LIST_PROJECTION
+        )
+    }
+    best_pages = {
+        (record["document_id"], record["page"]): record["text"] async for record in
+        db[DOCUMENT_TEXTS_COLLECTION].find(
+            {"$or": [{"document_id": hit["_id"], "page": hit["pages"][0]} for hit in ranked]},
+            {"document_id": 1, "page": 1, "text": 1}
+        )
+    }
+    terms = search_terms(q)
+    hits = []
+    for hit in ranked:
+        document = documents.get(hit["_id"])
+        if document is None:
+            # Deleted since its texts were indexed
+            continue
+        text = best_pages.get((hit["_id"], hit["pages"][0]), "")
+        document.update(
+            id=hit["_id"], score=hit["score"], pages=hit["pages"], snippet=make_snippet(text, terms)
+        )
+        hits.append(document)
+    return {"hits": hits, "next_offset": offset + limit if more else None}
+
+@router.get("/documents/totals/monthly", response_model=List[MonthlyTotal])
+async def get_monthly_totals(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: str = Depends(get_current_user)
+):
+    """Sum of document totals per month, computed in MongoDB.
+
+    See monthly_totals_pipeline for how a document's total and month are
+    chosen. Totals are exact decimal strings.
+    """
+    db = get_database()
+    currency = (currency or settings.default_currency).upper()
+    pipeline = monthly_totals_pipeline(current_user, currency, date_from, date_to)
+    return [
+        {
+            "month": f"{row['_id']['year']:04d}-{row['_id']['month']:02d}",
+            "currency": currency,
+            "total": str(row["total"].to_decimal()),
+            "documents": row["documents"],
+        }
+        async for row in db["documents"].aggregate(pipeline)
+    ]
+
+@router.get("/documents/duplicates", response_model=List[DuplicateCluster])
+async def get_duplicate_clusters(current_user: str = Depends(get_current_user)):
+    """Groups of your documents that share near-duplicate pages (rescans, photos of the same paper)"""
+    db = get_database()
+    edges = await db[PAGE_HASHES_COLLECTION].find(
+        {"owner_id": current_user, "duplicate_of": {"$exists": True}},
+        {"document_id": 1, "duplicate_of.document_id": 1}
+    ).to_list(length=None)
+    return duplicate_clusters(edges)
+
+@router.get("/{document_id}/text", response_model=DocumentText)
+async def get_document_text(
+    document_id: str,
+    page: Optional[int] = Query(None, ge=1),
+    start: int = Query(0, ge=0),
+    end: Optional[int] = Query(None, ge=0),
+    current_user: str = Depends(get_current_user)
+):
+    """OCR text of a document, or of one page, optionally sliced to [start, end)"""
+    db = get_database()
+    document = await db["documents"].find_one(
+        {"_id": ObjectId(document_id), "owner_id": current_user},
+        {"extracted_data.full_text": 1}
+    )
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    query = {"document_id": document_id}
+    if page is not None:
+        query["page"] = page
+    texts = [
+        record["text"] async for record in
+        db[DOCUMENT_TEXTS_COLLECTION].find(query, {"text": 1}).sort("page", 1)
+    ]
+    if not texts and page in (None, 1):
+        # Documents processed before texts were split out keep them inline
+        legacy_text = document.get("extracted_data", {}).get("full_text")
+        if legacy_text is not None:
+            texts = [legacy_text]
+    if not texts and page is not None:
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    text = "\n\n".join(texts)
+    end = len(text) if end is None else min(end, len(text))
+    start = min(start, end)
+    return {
+        "document_id": document_id,
+        "page": page,
+        "start": start,
+        "end": end,
+        "total_length": len(text),
+        "text": text[start:end],
+    }
+
 # @router.get("/{document_id}", response_model=Document)
 # async def get_document(
 #     document_id: str,
@@ -114,16 +488,55 @@ async def get_document(
     current_user: str = Depends(get_current_user)
 ):
     db = get_database()
-    document = await db["documents"].find_one({"_id": ObjectId(document_id), "owner_id": current_user})
+    # The index arrays are internal (and hold BSON types such as Decimal128)
+    document = await db["documents"].find_one(
+        {"_id": ObjectId(document_id), "owner_id": current_user}, {SEARCH_FIELDS: 0, TYPED_FIELDS: 0}
+    )
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     document["id"] = str(document["_id"])
+    # Key-value pairs are returned under extracted_data.key_value_pairs
+    return document
 
-    # Extract key-value pairs (can be used to display in a table or other format)
-    extracted_data = document.get("extracted_data", {})
-    key_value_pairs = extracted_data.get("key_value_pairs", {})
+@router.get("/{document_id}/progress")
+async def stream_document_progress(
+    document_id: str,
+    request: Request,
+    current_user: str = Depends(get_current_user)
+):
+    """Server-Sent Events stream of a document's processing progress.
 
-    return {
-        "document": document,
-        "extracted_data": key_value_pairs  # Include extracted data here
-    }
\ No newline at end of file
+    Emits an event whenever status or page counts change and closes once
+    the document is COMPLETED or FAILED. The server checks a projected
+    record once per progress_stream_poll_seconds, so clients do not have to
+    poll the full document.
+    """
+    db = get_database()
+    query = {"_id": ObjectId(document_id), "owner_id": current_user}
+    projection = {"status": 1, "processed_pages": 1, "total_pages": 1}
+    if not await db["documents"].find_one(query, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    async def events():
+        last = None
+        while not await request.is_disconnected():
+            document = await db["documents"].find_one(query, projection)
+            if document is None:
+                return
+            current = {
+                "status": document.get("status"),
+                "processed_pages": document.get("processed_pages", 0),
+                "total_pages": document.get("total_pages", 0),
+            }
+            if current != last:
+                yield f"event: progress\ndata: {json.dumps(current)}\n\n"
+                last = current
+            if current["status"] in (DocumentStatus.COMPLETED.value, DocumentStatus.FAILED.value):
+                return
+            await asyncio.sleep(settings.progress_stream_poll_seconds)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,60 @@
+import mimetypes
+import posixpath
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Tuple
+
+class Archive:
+    """Sequential access to the regular files of a zip or tar archive.
+
+    Iterating yields (filename, content_type, file object) per member; each
+    member is read as a stream, never extracted to disk or into memory.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        if zipfile.is_zipfile(fileobj):
+            fileobj.seek(0)
+            self._zip = zipfile.ZipFile(fileobj)
+            self._tar = None
+        else:
+            fileobj.seek(0)
+            try:
+                self._tar = tarfile.open(fileobj=fileobj, mode="r:*")
+            except tarfile.TarError:
+                raise ValueError("Unsupported archive format; expected zip or tar")
+            self._zip = None
+
+    def __iter__(self) -> Iterator[Tuple[str, str, BinaryIO]]:
+        if self._zip is not None:
+            for info in self._zip.infolist():
+                if not info.is_dir() and not _is_junk(info.filename):
+                    yield _describe(info.filename) + (self._zip.open(info),)
+        else:
+            for member in self._tar:
+                if member.isfile() and not _is_junk(member.name):
+                    yield _describe(member.name) + (self._tar.extractfile(member),)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _is_junk(name: str) -> bool:
+    basename = posixpath.basename(name)
+    return name.startswith("__MACOSX/") or basename.startswith(".")
+
+def _describe(name: str) -> Tuple[str, str]:
+    filename = posixpath.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return filename, content_type
+
+def open_archive(fileobj: BinaryIO) -> Archive:
+    """Open an uploaded archive (blocking; reads the zip directory or tar header)"""
+    return Archive(fileobj)
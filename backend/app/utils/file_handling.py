@@ -1,18 +1,25 @@
 import os
+import hashlib
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union
+from typing import AsyncIterator, BinaryIO, Iterator, Optional, Tuple, Union
 import shutil
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 import logging
 from app.core.config import settings
+from app.utils.storage import get_storage
 
 logger = logging.getLogger(__name__)
 
 # Ensure temp storage directory exists
-temp_storage = Path(settings.temp_storage_path if hasattr(settings, 'temp_storage_path') else "temp_storage")
+temp_storage = Path(settings.temp_storage_path)
 temp_storage.mkdir(parents=True, exist_ok=True)
 
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size"""
+
 def save_temp_file(file_data: Union[bytes, UploadFile], file_type: str = None) -> str:
     """Save file data to a temporary file and return its path"""
     try:
@@ -57,25 +64,87 @@ def cleanup_temp_file(file_path: str):
     except Exception as e:
         logger.error(f"Error cleaning up temporary file {file_path}: {e}")
 
-async def save_document_file(document_id: str, file_data: bytes):
-    """Save document file to persistent storage"""
+def document_key(document_id: str) -> str:
+    """Storage key of a document's file"""
+    return f"{document_id}.dat"
+
+async def save_stream(document_id: str, chunks: AsyncIterator[bytes], max_size: int) -> Tuple[int, str]:
+    """Stream chunks into persistent storage.
+
+    Returns the size and SHA-256 hex digest, both computed while streaming.
+    Raises FileTooLargeError as soon as more than max_size bytes arrive.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    async def checked():
+        nonlocal size
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(f"Upload exceeds {max_size} bytes")
+            digest.update(chunk)
+            yield chunk
+
     try:
-        doc_storage = temp_storage / "documents"
-        doc_storage.mkdir(parents=True, exist_ok=True)
-        
-        file_path = doc_storage / f"{document_id}.dat"
-        with open(file_path, "wb") as f:
-            f.write(file_data)
+        await get_storage().write_stream(document_key(document_id), checked())
+        return size, digest.hexdigest()
+    except FileTooLargeError:
+        raise
     except Exception as e:
         logger.error(f"Error saving document file {document_id}: {e}")
         raise
 
-async def load_document_file(document_id: str) -> bytes:
-    """Load document file from persistent storage"""
+async def iter_upload_chunks(upload: UploadFile) -> AsyncIterator[bytes]:
+    """Read an UploadFile in upload_chunk_size chunks"""
+    await upload.seek(0)
+    while chunk := await upload.read(settings.upload_chunk_size):
+        yield chunk
+
+async def iter_file_chunks(f: BinaryIO) -> AsyncIterator[bytes]:
+    """Read a blocking file object in upload_chunk_size chunks off the event loop"""
+    while chunk := await run_in_threadpool(f.read, settings.upload_chunk_size):
+        yield chunk
+
+async def peek_chunks(chunks: AsyncIterator[bytes], size: int) -> Tuple[bytes, AsyncIterator[bytes]]:
+    """Read the first `size` bytes of a chunk stream without consuming it.
+
+    Returns the prefix (shorter if the stream is) and a stream that yields
+    every chunk again from the start.
+    """
+    buffered = []
+    length = 0
+    async for chunk in chunks:
+        buffered.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            break
+
+    async def replay():
+        for chunk in buffered:
+            yield chunk
+        async for chunk in chunks:
+            yield chunk
+
+    return b"".join(buffered)[:size], replay()
+
+@contextmanager
+def open_document_file(document_id: str) -> Iterator[str]:
+    """Yield a local path to a stored document file (blocking, for workers)"""
+    with get_storage().local_file(document_key(document_id)) as path:
+        yield path
+
+async def delete_document_file(document_id: str):
+    """Remove a stored document file"""
     try:
-        file_path = temp_storage / "documents" / f"{document_id}.dat"
-        with open(file_path, "rb") as f:
-            return f.read()
+        await get_storage().delete(document_key(document_id))
+    except Exception as e:
+        logger.error(f"Error deleting document file {document_id}: {e}")
+
+async def load_document_file(document_id: str, start: int = 0, end: Optional[int] = None) -> bytes:
+    """Load document file (or the byte range [start, end) of it) from persistent storage"""
+    try:
+        return await get_storage().read(document_key(document_id), start, end)
     except Exception as e:
         logger.error(f"Error loading document file {document_id}: {e}")
-        raise
\ No newline at end of file
+        raise
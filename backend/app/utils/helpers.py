@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+import base64
 import json
 from bson import ObjectId
 from fastapi.encoders import jsonable_encoder
@@ -34,4 +35,18 @@ def validate_object_id(id: str) -> ObjectId:
 
 def get_current_timestamp() -> datetime:
     """Get current UTC timestamp"""
-    return datetime.utcnow()
\ No newline at end of file
+    return datetime.utcnow()
+
+def encode_cursor(sort_value: datetime, id: ObjectId) -> str:
+    """Opaque continuation token for keyset pagination"""
+    payload = json.dumps({"d": sort_value.isoformat(), "i": str(id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["d"]), ObjectId(payload["i"])
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
@@ -0,0 +1,216 @@
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import AsyncIterator, ContextManager, Iterator, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class StorageBackend(ABC):
+    """Interface for document file storage.
+
+    The async methods are used by the API; local_file() is the blocking
+    entry point for worker processes that need the content on disk.
+    """
+
+    @abstractmethod
+    async def write_stream(self, key: str, chunks: AsyncIterator[bytes]):
+        """Store a stream of chunks under key. Readers never see a partial file."""
+
+    async def write(self, key: str, data: bytes):
+        async def single():
+            yield data
+        await self.write_stream(key, single())
+
+    @abstractmethod
+    async def read(self, key: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """Read bytes [start, end) of an object; end=None reads to the end"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove an object; missing objects are ignored"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under key"""
+
+    @abstractmethod
+    def local_file(self, key: str) -> ContextManager[str]:
+        """Context manager yielding a local filesystem path holding the object's content"""
+
+class LocalStorage(StorageBackend):
+    """Files on local disk under a two-level hashed directory fan-out.
+
+    Keys are spread over 256 x 256 directories by the hash of the key, so
+    no single directory grows past a few hundred entries even with millions
+    of documents. Blocking file I/O runs in the threadpool.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / key
+
+    def _existing_path(self, key: str) -> Path:
+        path = self.path_for(key)
+        if not path.exists():
+            # Files stored before the fan-out was introduced live at the top level
+            legacy_path = self.root / key
+            if legacy_path.exists():
+                return legacy_path
+        return path
+
+    async def write_stream(self, key: str, chunks: AsyncIterator[bytes]):
+        path = self.path_for(key)
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        fd, temp_path = await run_in_threadpool(tempfile.mkstemp, dir=path.parent, suffix=".part")
+        f = os.fdopen(fd, "wb")
+        try:
+            async for chunk in chunks:
+                await run_in_threadpool(f.write, chunk)
+            await run_in_threadpool(f.close)
+            # Atomic within a filesystem: readers see the old file or the complete new one
+            await run_in_threadpool(os.replace, temp_path, path)
+        except BaseException:
+            f.close()
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _read_range(self, key: str, start: int, end: Optional[int]) -> bytes:
+        with open(self._existing_path(key), "rb") as f:
+            f.seek(start)
+            return f.read() if end is None else f.read(max(end - start, 0))
+
+    async def read(self, key: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        return await run_in_threadpool(self._read_range, key, start, end)
+
+    def _delete(self, key: str):
+        path = self._existing_path(key)
+        if path.exists():
+            path.unlink()
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self._delete, key)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(lambda: self._existing_path(key).exists())
+
+    @contextmanager
+    def local_file(self, key: str) -> Iterator[str]:
+        path = self._existing_path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"No stored file for {key}")
+        yield str(path)
+
+class S3Storage(StorageBackend):
+    """Objects in an S3-compatible bucket (AWS S3, MinIO, moto, ...)"""
+
+    # S3 multipart parts must be at least 5 MB, except the last one
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def write_stream(self, key: str, chunks: AsyncIterator[bytes]):
+        object_key = self.object_key(key)
+        upload = await run_in_threadpool(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=object_key
+        )
+        upload_id = upload["UploadId"]
+        parts = []
+        buffer = bytearray()
+
+        async def flush():
+            part_number = len(parts) + 1
+            part = await run_in_threadpool(
+                self.client.upload_part, Bucket=self.bucket, Key=object_key,
+                UploadId=upload_id, PartNumber=part_number, Body=bytes(buffer)
+            )
+            parts.append({"ETag": part["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) >= self.PART_SIZE:
+                    await flush()
+            if buffer or not parts:
+                await flush()
+            # The object only becomes visible once the upload is completed
+            await run_in_threadpool(
+                self.client.complete_multipart_upload, Bucket=self.bucket, Key=object_key,
+                UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            await run_in_threadpool(
+                self.client.abort_multipart_upload, Bucket=self.bucket, Key=object_key, UploadId=upload_id
+            )
+            raise
+
+    def _read_range(self, key: str, start: int, end: Optional[int]) -> bytes:
+        kwargs = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if start or end is not None:
+            if end is not None and end <= start:
+                return b""
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        return self.client.get_object(**kwargs)["Body"].read()
+
+    async def read(self, key: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        return await run_in_threadpool(self._read_range, key, start, end)
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self.object_key(key))
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self._exists, key)
+
+    @contextmanager
+    def local_file(self, key: str) -> Iterator[str]:
+        fd, temp_path = tempfile.mkstemp(suffix=".dat")
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self.object_key(key), temp_path)
+            yield temp_path
+        finally:
+            os.unlink(temp_path)
+
+_storage: Optional[StorageBackend] = None
+
+def get_storage() -> StorageBackend:
+    """Return the configured storage backend"""
+    global _storage
+    if _storage is None:
+        if settings.storage_backend == "s3":
+            _storage = S3Storage(settings.s3_bucket, settings.s3_prefix, settings.s3_endpoint_url)
+        elif settings.storage_backend == "local":
+            _storage = LocalStorage(Path(settings.temp_storage_path) / "documents")
+        else:
+            raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+    return _storage
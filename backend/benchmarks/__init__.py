@@ -0,0 +1,4 @@
+"""Benchmarks for the document processing pipeline.
+
+Run from the backend/ directory, e.g. ``python -m benchmarks.bench_ocr_handoff``.
+"""
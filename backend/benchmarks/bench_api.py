@@ -0,0 +1,231 @@
+"""In-process load test of the API on a seeded database.
+
+Drives the FastAPI app through httpx without a network hop: registers a
+user, uploads the synthetic corpus, seeds completed documents (with texts,
+search fields and typed fields, as the worker would store them) and then
+measures latency and throughput of uploads, cursor-paginated listing,
+field search, text search and document reads at a given concurrency.
+
+Runs against a scratch database on the MongoDB at settings.mongodb_url,
+dropped afterwards, or with --mongomock against mongomock-motor (pip
+install mongomock-motor) when no mongod is available. mongomock has no
+$text support, so text search is skipped there, and its timings say
+nothing about index use; compare mongomock runs only with each other.
+
+    python -m benchmarks.bench_api [--documents 2000] [--concurrency 8] [--mongomock]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+from bson import ObjectId
+import httpx
+from app.core import database
+from app.core.config import settings
+from app.models.document import DocumentStatus
+from app.processing.extractor import run_extraction
+from app.processing.search import SEARCH_FIELDS, build_search_fields
+from app.processing.source import DocumentSource
+from app.processing.texts import split_extracted_data, store_texts
+from app.processing.typed_fields import TYPED_FIELDS, build_typed_fields
+from benchmarks.common import emit, percentiles
+from benchmarks.corpus import generate_corpus, invoice_lines, load_corpus
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark-password"
+
+def connect(mongomock: bool):
+    """Point the app at a scratch database and return (client, database name)"""
+    name = f"{settings.mongodb_name}_benchmark"
+    if mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--mongomock needs mongomock-motor: pip install mongomock-motor")
+        client = AsyncMongoMockClient()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(settings.mongodb_url)
+    database.db = client[name]
+    return client, name
+
+def seed_record(owner_id: str, number: int, upload_date: datetime, rng: random.Random):
+    """A completed document as the worker stores it, and its page texts"""
+    text = "\n".join(invoice_lines(rng, number))
+    with DocumentSource.from_bytes(text.encode("utf-8"), "text/plain") as source:
+        extracted = run_extraction(source, "text/plain")
+    summary, texts = split_extracted_data(extracted)
+    pairs = summary.get("key_value_pairs", {})
+    record = {
+        "_id": ObjectId(),
+        "filename": f"seed_{number}.txt",
+        "content_type": "text/plain",
+        "size": len(text),
+        "upload_date": upload_date,
+        "owner_id": owner_id,
+        "status": DocumentStatus.COMPLETED.value,
+        "extracted_data": summary,
+        SEARCH_FIELDS: build_search_fields(pairs),
+        TYPED_FIELDS: build_typed_fields(pairs, summary.get("provenance")),
+        "processed_pages": 1,
+        "total_pages": 1,
+    }
+    return record, texts
+
+async def seed(db, owner_id: str, count: int, seed: int) -> List[str]:
+    """Insert count completed documents and return their ids"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=1)
+    records = []
+    for number in range(count):
+        record, texts = seed_record(owner_id, number, start - timedelta(seconds=number), rng)
+        await store_texts(db, str(record["_id"]), owner_id, texts)
+        records.append(record)
+    for offset in range(0, len(records), 1000):
+        await db["documents"].insert_many(records[offset:offset + 1000], ordered=False)
+    return [str(record["_id"]) for record in records]
+
+async def run_load(call: Callable[[int], Awaitable[httpx.Response]], requests: int, concurrency: int) -> Dict:
+    """Issue call(i) for i in range(requests), concurrency at a time"""
+    latencies = []
+    errors = 0
+    next_request = 0
+
+    async def runner():
+        nonlocal next_request, errors
+        while next_request < requests:
+            i = next_request
+            next_request += 1
+            start = time.perf_counter()
+            response = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(runner() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_sec": requests / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "latency_seconds": percentiles(latencies),
+    }
+
+async def walk_pages(client: httpx.AsyncClient, headers: Dict, page_size: int) -> Dict:
+    """Follow X-Next-Cursor through the whole listing, one page at a time"""
+    latencies = []
+    params = {"limit": page_size}
+    while True:
+        start = time.perf_counter()
+        response = await client.get("/api/", params=params, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": page_size, "cursor": cursor}
+    return {"pages": len(latencies), "latency_seconds": percentiles(latencies)}
+
+async def run(args, corpus_dir: str) -> Dict:
+    from app.main import app, shutdown_db_client, startup_db_client
+
+    client, name = connect(args.mongomock)
+    db = database.get_database()
+    results = {"backend": "mongomock" if args.mongomock else "mongodb", "documents": args.documents,
+               "concurrency": args.concurrency}
+    try:
+        await client.drop_database(name)
+        if not args.mongomock:
+            # Indexes (and the event loop lag monitor) as on a real start-up
+            await startup_db_client()
+
+        # Server errors are counted per scenario rather than aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+            response = await http.post("/api/auth/register", json={
+                "username": USERNAME, "email": "benchmark@example.com", "password": PASSWORD
+            })
+            response.raise_for_status()
+            response = await http.post("/api/auth/token", data={"username": USERNAME, "password": PASSWORD})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            entries = load_corpus(corpus_dir)
+            files = []
+            for entry in entries:
+                with open(os.path.join(corpus_dir, entry["filename"]), "rb") as f:
+                    files.append((entry["filename"], f.read(), entry["content_type"]))
+
+            async def upload(i):
+                filename, data, content_type = files[i % len(files)]
+                return await http.post("/api/documents/upload", headers=headers,
+                                       files={"file": (filename, data, content_type)})
+
+            results["upload"] = await run_load(upload, len(files) * args.repeat, args.concurrency)
+            if results["upload"]["errors"] == len(files) * args.repeat:
+                raise SystemExit("Every upload failed; not reporting timings of error responses")
+
+            start = time.perf_counter()
+            document_ids = await seed(db, USERNAME, args.documents, args.seed)
+            results["seed_seconds"] = time.perf_counter() - start
+
+            results["list_walk"] = await walk_pages(http, headers, args.page_size)
+
+            async def first_page(i):
+                return await http.get("/api/", params={"limit": args.page_size}, headers=headers)
+
+            async def get_document(i):
+                return await http.get(f"/api/{document_ids[i % len(document_ids)]}", headers=headers)
+
+            async def field_search(i):
+                value = f"INV-{100000 + i % args.documents}"
+                return await http.get("/api/documents/search", headers=headers,
+                                      params={"field": "invoice_number", "value": value})
+
+            async def text_search(i):
+                return await http.get("/api/documents/search", headers=headers,
+                                      params={"q": "consulting services", "limit": 20})
+
+            scenarios = {"list_first_page": first_page, "get_document": get_document,
+                         "field_search": field_search}
+            if not args.mongomock:
+                scenarios["text_search"] = text_search
+            for scenario, call in scenarios.items():
+                results[scenario] = await run_load(call, args.requests, args.concurrency)
+                if results[scenario]["errors"] == args.requests:
+                    raise SystemExit(f"Every {scenario} request failed; not reporting its timings")
+    finally:
+        await client.drop_database(name)
+        if not args.mongomock:
+            await shutdown_db_client()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="corpus directory to upload (generated with --seed if omitted)")
+    parser.add_argument("--documents", type=int, default=2000, help="completed documents to seed")
+    parser.add_argument("--requests", type=int, default=500, help="requests per read scenario")
+    parser.add_argument("--repeat", type=int, default=1, help="times each corpus file is uploaded")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MongoDB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Uploaded files go to a throwaway local store, never the real one
+        settings.storage_backend = "local"
+        settings.temp_storage_path = os.path.join(directory, "storage")
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = os.path.join(directory, "corpus")
+            generate_corpus(corpus_dir, seed=args.seed, page_counts=[1, 5])
+        results = asyncio.run(run(args, corpus_dir))
+    emit("api", results)
+
+if __name__ == "__main__":
+    main()
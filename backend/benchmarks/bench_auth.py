@@ -0,0 +1,62 @@
+"""Authenticated request throughput with and without the token cache.
+
+Measures get_current_user on its own and behind a minimal in-process
+FastAPI route, once with signature verification on every call and once
+with validated tokens served from the cache.
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.security import create_access_token, get_current_user, token_cache, token_cache_stats
+from benchmarks.common import emit
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(current_user: str = Depends(get_current_user)):
+        return {"user": current_user}
+
+    return app
+
+def dependency_rate(token: str, calls: int) -> float:
+    async def run():
+        for _ in range(calls):
+            await get_current_user(token)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return calls / (time.perf_counter() - start)
+
+def request_rate(client: TestClient, token: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/whoami", headers=headers).raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "benchmark"}, timedelta(minutes=30))
+    client = TestClient(build_app())
+    results = {}
+    for enabled in (False, True):
+        settings.token_cache_enabled = enabled
+        token_cache.clear()
+        results["cached" if enabled else "uncached"] = {
+            "dependency_calls_per_sec": dependency_rate(token, args.calls),
+            "requests_per_sec": request_rate(client, token, args.requests),
+        }
+    results["cache"] = token_cache_stats()
+    emit("auth", results)
+
+if __name__ == "__main__":
+    main()
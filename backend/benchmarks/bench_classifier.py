@@ -0,0 +1,56 @@
+"""Classification cost per upload: fresh libmagic handle on the whole file
+versus the cached per-thread handle on a bounded header prefix.
+"""
+import argparse
+import io
+import magic
+from app.core.config import settings
+from app.processing.classifier import DocumentClassifier
+from benchmarks.common import SAMPLE_LINES, emit, measure, render_text_page
+
+def sample_files(pages: int) -> dict:
+    page = render_text_page()
+    pdf = io.BytesIO()
+    page.save(pdf, format="PDF", save_all=True, append_images=[page] * (pages - 1), resolution=300)
+    png = io.BytesIO()
+    page.save(png, format="PNG")
+    text = ("\n".join(SAMPLE_LINES) + "\n") * 2000
+    return {
+        "pdf": (pdf.getvalue(), "INV-104233_2024-03-04.pdf"),
+        "png": (png.getvalue(), "scan_20240304.png"),
+        "text": (text.encode("utf-8"), "notes.txt"),
+    }
+
+def classify_legacy(data: bytes, filename: str) -> str:
+    # What the classifier used to do: load the database and scan everything
+    return magic.Magic(mime=True).from_buffer(data)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"header_bytes": settings.classifier_header_bytes}
+    for name, (data, filename) in sample_files(args.pages).items():
+        def legacy():
+            for _ in range(args.calls):
+                classify_legacy(data, filename)
+
+        def current():
+            for _ in range(args.calls):
+                DocumentClassifier.classify_document(data, filename)
+
+        legacy_timing = measure(legacy, repeat=args.repeat)
+        current_timing = measure(current, repeat=args.repeat)
+        results[name] = {
+            "size": len(data),
+            "type": DocumentClassifier.classify_document(data, filename)["type"],
+            "legacy_per_call_ms": legacy_timing["median"] / args.calls * 1000,
+            "cached_prefix_per_call_ms": current_timing["median"] / args.calls * 1000,
+        }
+    emit("classifier", results)
+
+if __name__ == "__main__":
+    main()
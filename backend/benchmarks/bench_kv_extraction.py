@@ -0,0 +1,71 @@
+"""Key/value extraction cost on large synthetic texts.
+
+Runs the original five-pass regex implementation next to the single-pass
+engine for growing text sizes; seconds per MB should stay flat for the
+new engine.
+"""
+import argparse
+import random
+import re
+from app.processing.kv_extraction import extract_pairs
+from benchmarks.common import SAMPLE_LINES, emit, measure
+
+FILLER = [
+    "Thank you for your business",
+    "Payment is due within thirty days of the invoice date",
+    "Please include the invoice number with your remittance",
+    "items shipped separately may arrive on different days",
+]
+
+def legacy_extract_key_value_pairs(text: str):
+    """The implementation this engine replaced, kept for comparison"""
+    pairs = {}
+    patterns = [
+        r'([A-Z][a-zA-Z\s]+):\s*(.+)',
+        r'([A-Z][a-zA-Z\s]+)\s*=\s*(.+)',
+        r'(?<=\n)([A-Z][a-zA-Z\s]+)\s+([^\n]+)',
+    ]
+    for pattern in patterns:
+        for match in re.findall(pattern, text):
+            key = match[0].strip()
+            value = match[1].strip()
+            if key and value:
+                pairs[key] = value
+    date_matches = re.findall(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', text)
+    if date_matches:
+        pairs['extracted_dates'] = date_matches
+    amount_matches = re.findall(r'(\$\d+\.\d{2})', text)
+    if amount_matches:
+        pairs['extracted_amounts'] = amount_matches
+    return pairs
+
+def synthetic_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    while length < size:
+        line = rng.choice(SAMPLE_LINES + FILLER)
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 4_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        text = synthetic_text(size)
+        megabytes = len(text) / 1_000_000
+        entry = {}
+        for name, fn in (("legacy", legacy_extract_key_value_pairs), ("single_pass", extract_pairs)):
+            timing = measure(lambda: fn(text), args.repeat)
+            timing["seconds_per_mb"] = timing["median"] / megabytes
+            entry[name] = timing
+        results[str(size)] = entry
+    emit("kv_extraction", results)
+
+if __name__ == "__main__":
+    main()
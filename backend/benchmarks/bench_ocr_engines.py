@@ -0,0 +1,52 @@
+"""Pages/sec of each OCR engine on a fixed synthetic corpus.
+
+The tesserocr engine keeps the language model loaded between pages; the
+pytesseract engine starts a tesseract process for each one. Small pages
+(receipts) show the difference most.
+"""
+import argparse
+import time
+from app.processing.ocr import OCR_ENGINES, create_ocr_engine
+from benchmarks.common import SAMPLE_LINES, emit, render_text_page
+
+def build_corpus(pages: int):
+    """Alternate full pages with receipt-sized ones"""
+    corpus = []
+    for i in range(pages):
+        lines = SAMPLE_LINES[: 3 + i % len(SAMPLE_LINES)]
+        size = (2480, 3508) if i % 2 == 0 else (900, 1400)
+        corpus.append(render_text_page(lines, size=size))
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--engine", action="append", choices=sorted(OCR_ENGINES),
+                        help="engine to benchmark (default: all)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages)
+    results = {}
+    for name in args.engine or sorted(OCR_ENGINES):
+        engine = create_ocr_engine(name)
+        if engine.name != name:
+            results[name] = {"skipped": "not installed"}
+            continue
+        try:
+            engine.image_to_string(corpus[0])  # warm up
+            start = time.perf_counter()
+            characters = sum(len(engine.image_to_string(page)) for page in corpus)
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.close()
+        results[name] = {
+            "version": engine.version(),
+            "pages": len(corpus),
+            "seconds": elapsed,
+            "pages_per_sec": len(corpus) / elapsed,
+            "characters": characters,
+        }
+    emit("ocr_engines", results)
+
+if __name__ == "__main__":
+    main()
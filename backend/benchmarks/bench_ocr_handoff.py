@@ -0,0 +1,42 @@
+"""Per-page cost of handing a rasterized page to Tesseract.
+
+Compares the old JPEG round trip (encode, decode, pytesseract temp file)
+with passing the PIL image straight to run_tesseract over a pipe.
+"""
+import argparse
+import io
+import pytesseract
+from PIL import Image
+from app.processing.ocr import extract_text_from_image, image_to_pnm
+from benchmarks.common import emit, measure, render_text_page
+
+def jpeg_round_trip(page: Image.Image) -> str:
+    buffer = io.BytesIO()
+    page.save(buffer, format="JPEG")
+    return pytesseract.image_to_string(Image.open(io.BytesIO(buffer.getvalue())))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page = render_text_page()
+
+    def encode_jpeg():
+        buffer = io.BytesIO()
+        page.save(buffer, format="JPEG")
+        Image.open(io.BytesIO(buffer.getvalue())).load()
+
+    emit("ocr_handoff", {
+        "handoff_only": {
+            "jpeg_encode_decode": measure(encode_jpeg, args.repeat),
+            "pnm_encode": measure(lambda: image_to_pnm(page), args.repeat),
+        },
+        "end_to_end": {
+            "jpeg_pytesseract": measure(lambda: jpeg_round_trip(page), args.repeat),
+            "image_stdin": measure(lambda: extract_text_from_image(page), args.repeat),
+        },
+    })
+
+if __name__ == "__main__":
+    main()
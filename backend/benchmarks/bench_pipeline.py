@@ -0,0 +1,100 @@
+"""Offline throughput of the processing pipeline on the synthetic corpus.
+
+Runs run_extraction (the worker's code path, without MongoDB or the job
+queue) over every document of a corpus generated by benchmarks.corpus and
+reports per-document latency, pages per second by document kind, key/value
+pairs found and character accuracy against the ground truth. Per-stage
+timings come from the pipeline's own metrics.
+
+    python -m benchmarks.bench_pipeline [--corpus DIR] [--repeat 1]
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+from app.core.config import settings
+from app.core.metrics import PAGES_TOTAL, STAGE_SECONDS
+from app.processing.extractor import run_extraction
+from app.processing.source import DocumentSource
+from benchmarks.common import character_accuracy, emit, percentiles
+from benchmarks.corpus import generate_corpus, load_corpus
+
+def document_kind(entry) -> str:
+    # scanned_5p.pdf -> scanned_pdf, scan_0.png -> png, note_1.txt -> txt
+    stem, extension = os.path.splitext(entry["filename"])
+    prefix = stem.split("_")[0]
+    return f"{prefix}_pdf" if extension == ".pdf" else extension.lstrip(".")
+
+def stage_summary():
+    """Seconds and count per stage and pages per text source, from the metrics registry"""
+    return {
+        "stages": {
+            stage: {"count": count, "seconds": seconds}
+            for (stage,), (count, seconds) in STAGE_SECONDS.collect().items()
+        },
+        "pages_by_source": {source: count for (source,), count in PAGES_TOTAL.collect().items()},
+    }
+
+def run(corpus_dir: str, repeat: int):
+    entries = load_corpus(corpus_dir)
+    latencies = defaultdict(list)
+    pages = defaultdict(int)
+    busy = defaultdict(float)
+    accuracy = defaultdict(list)
+    pairs = defaultdict(list)
+    for _ in range(repeat):
+        for entry in entries:
+            kind = document_kind(entry)
+            path = os.path.join(corpus_dir, entry["filename"])
+            start = time.perf_counter()
+            with DocumentSource.from_path(path, entry["content_type"]) as source:
+                result = run_extraction(source, entry["content_type"])
+            elapsed = time.perf_counter() - start
+            latencies[kind].append(elapsed)
+            pages[kind] += len(result["pages"])
+            busy[kind] += elapsed
+            pairs[kind].append(len(result["key_value_pairs"]))
+            for page, expected in zip(result["pages"], entry["text"]):
+                accuracy[kind].append(character_accuracy(page["text"], expected))
+
+    results = {"kinds": {}}
+    for kind in latencies:
+        results["kinds"][kind] = {
+            "documents": len(latencies[kind]),
+            "pages": pages[kind],
+            "pages_per_sec": pages[kind] / busy[kind] if busy[kind] else 0.0,
+            "latency_seconds": percentiles(latencies[kind]),
+            "accuracy": sum(accuracy[kind]) / len(accuracy[kind]) if accuracy[kind] else None,
+            "mean_pairs": sum(pairs[kind]) / len(pairs[kind]),
+        }
+    total_pages = sum(pages.values())
+    total_busy = sum(busy.values())
+    results["pages_per_sec"] = total_pages / total_busy if total_busy else 0.0
+    results.update(stage_summary())
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="corpus directory (generated with the default seed if omitted)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--page-counts", type=int, nargs="+", default=[1, 5, 20])
+    args = parser.parse_args()
+
+    settings_used = {
+        "ocr_engine": settings.ocr_engine,
+        "ocr_dpi": settings.ocr_dpi,
+        "ocr_workers": settings.ocr_workers,
+        "text_layer_enabled": settings.text_layer_enabled,
+    }
+    if args.corpus:
+        results = run(args.corpus, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            generate_corpus(directory, page_counts=args.page_counts)
+            results = run(directory, args.repeat)
+    results["settings"] = settings_used
+    emit("pipeline", results)
+
+if __name__ == "__main__":
+    main()
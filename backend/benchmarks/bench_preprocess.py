@@ -0,0 +1,73 @@
+"""Pages per second and OCR character accuracy for each preprocessing preset.
+
+The fixture corpus is rendered on the fly as image-only PDFs: clean pages,
+pages with small print, skewed scans and noisy, low-contrast scans, each
+with known ground truth text.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from PIL import Image, ImageFilter
+from app.processing.ocr import ocr_pdf_serial
+from app.processing.preprocess import PRESETS
+from benchmarks.common import SAMPLE_LINES, character_accuracy, emit, render_text_page
+
+def make_page(kind: str, rng: random.Random) -> Image.Image:
+    if kind == "small_print":
+        return render_text_page(font_size=28)
+    page = render_text_page()
+    if kind == "skewed":
+        page = page.rotate(rng.uniform(-3, 3), resample=Image.BICUBIC, fillcolor="white")
+    elif kind == "noisy":
+        gray = page.convert("L").filter(ImageFilter.GaussianBlur(1.2))
+        # Grey paper, faded ink and speckles
+        gray = gray.point(lambda level: 70 + level * 150 // 255)
+        pixels = gray.load()
+        for _ in range(20000):
+            x, y = rng.randrange(gray.width), rng.randrange(gray.height)
+            pixels[x, y] = rng.choice((40, 230))
+        page = gray.convert("RGB")
+    return page
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages-per-kind", type=int, default=2)
+    parser.add_argument("--presets", nargs="*", default=list(PRESETS))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    kinds = ["clean", "small_print", "skewed", "noisy"]
+    expected = "\n".join(SAMPLE_LINES)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = {}
+        for kind in kinds:
+            pages = [make_page(kind, rng) for _ in range(args.pages_per_kind)]
+            path = os.path.join(directory, f"{kind}.pdf")
+            pages[0].save(path, format="PDF", save_all=True, append_images=pages[1:], resolution=300)
+            corpus[kind] = path
+
+        for name in args.presets:
+            options = PRESETS[name]
+            preset = {"options": options.key()}
+            total_pages = 0
+            total_time = 0.0
+            for kind, path in corpus.items():
+                start = time.perf_counter()
+                texts = list(ocr_pdf_serial(path, list(range(1, args.pages_per_kind + 1)), options))
+                elapsed = time.perf_counter() - start
+                total_pages += len(texts)
+                total_time += elapsed
+                preset[kind] = {
+                    "pages_per_sec": len(texts) / elapsed,
+                    "accuracy": sum(character_accuracy(text, expected) for text in texts) / len(texts),
+                }
+            preset["pages_per_sec"] = total_pages / total_time
+            preset["accuracy"] = sum(preset[kind]["accuracy"] for kind in kinds) / len(kinds)
+            results[name] = preset
+    emit("preprocess", results)
+
+if __name__ == "__main__":
+    main()
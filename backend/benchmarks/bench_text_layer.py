@@ -0,0 +1,73 @@
+"""Pages per second for born-digital PDFs with and without the text-layer
+fast path, plus a mixed PDF (every other page scanned) and a large .docx.
+"""
+import argparse
+import os
+import tempfile
+import time
+import zipfile
+from pypdf import PdfReader, PdfWriter
+from app.core.config import settings
+from app.processing.ocr import iter_page_texts
+from app.processing.source import DocumentSource
+from benchmarks.common import SAMPLE_LINES, emit, render_text_page, text_pdf
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def write_mixed_pdf(path: str, digital_path: str, pages: int):
+    # Interleave text-layer pages with image-only scans of the same content
+    scanned_path = path + ".scan.pdf"
+    render_text_page().save(scanned_path, format="PDF", resolution=300)
+    digital = PdfReader(digital_path)
+    scanned = PdfReader(scanned_path)
+    writer = PdfWriter()
+    for i in range(pages):
+        writer.add_page(digital.pages[i] if i % 2 == 0 else scanned.pages[0])
+    with open(path, "wb") as f:
+        writer.write(f)
+    os.unlink(scanned_path)
+
+def write_docx(path: str, paragraphs: int):
+    body = "".join(f"<w:p><w:r><w:t>{SAMPLE_LINES[i % len(SAMPLE_LINES)]}</w:t></w:r></w:p>"
+                   for i in range(paragraphs))
+    xml = ('<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="http://schemas.openxmlformats.org/'
+           f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", xml)
+
+def pages_per_second(path: str, content_type: str) -> float:
+    start = time.perf_counter()
+    with DocumentSource.from_path(path, content_type) as source:
+        pages = sum(1 for _ in iter_page_texts(source, content_type))
+    return pages / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--paragraphs", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        digital_path = os.path.join(directory, "digital.pdf")
+        with open(digital_path, "wb") as f:
+            f.write(text_pdf([SAMPLE_LINES] * args.pages))
+        mixed_path = os.path.join(directory, "mixed.pdf")
+        write_mixed_pdf(mixed_path, digital_path, args.pages)
+        docx_path = os.path.join(directory, "large.docx")
+        write_docx(docx_path, args.paragraphs)
+
+        results = {}
+        for enabled in (False, True):
+            settings.text_layer_enabled = enabled
+            results["text_layer" if enabled else "ocr_only"] = {
+                "digital_pdf_pages_per_sec": pages_per_second(digital_path, "application/pdf"),
+                "mixed_pdf_pages_per_sec": pages_per_second(mixed_path, "application/pdf"),
+            }
+        start = time.perf_counter()
+        pages_per_second(docx_path, DOCX_TYPE)
+        results["docx_seconds"] = time.perf_counter() - start
+        results["docx_paragraphs"] = args.paragraphs
+    emit("text_layer", results)
+
+if __name__ == "__main__":
+    main()
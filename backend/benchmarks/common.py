@@ -0,0 +1,140 @@
+"""Shared helpers for the benchmarks in this package"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from PIL import Image, ImageDraw, ImageFont
+
+# A4 at 300 DPI, the size pages come out of the rasterizer at
+A4_300DPI = (2480, 3508)
+
+SAMPLE_LINES = [
+    "INVOICE",
+    "Invoice Number: INV-104233",
+    "Date: 03/04/2024",
+    "Bill To: Acme Corporation",
+    "Description                Qty      Amount",
+    "Consulting services          4     $1200.00",
+    "Travel expenses              1      $312.50",
+    "Subtotal: $1512.50",
+    "Tax = $151.25",
+    "Total Due: $1663.75",
+]
+
+def render_text_page(lines: Optional[List[str]] = None, size=A4_300DPI, font_size: int = 42) -> Image.Image:
+    """Render lines of text onto a white page, like a clean scan"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", font_size)
+    except OSError:
+        font = ImageFont.load_default()
+    y = size[1] // 12
+    for line in lines or SAMPLE_LINES:
+        draw.text((size[0] // 12, y), line, fill="black", font=font)
+        y += int(font_size * 1.6)
+    return image
+
+def text_pdf(pages: List[List[str]]) -> bytes:
+    """A born-digital PDF: one A4 page of Helvetica text per list of lines"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = "BT /F1 11 Tf 14 TL 60 780 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream.encode("latin-1")))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{kid} 0 R" for kid in kids).encode(), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def character_accuracy(recognized: str, expected: str) -> float:
+    """1 - (edit distance / expected length), comparing whitespace-normalized text"""
+    recognized = " ".join(recognized.split())
+    expected = " ".join(expected.split())
+    if not expected:
+        return 1.0 if not recognized else 0.0
+    previous = list(range(len(recognized) + 1))
+    for i, expected_char in enumerate(expected, 1):
+        current = [i]
+        for j, recognized_char in enumerate(recognized, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (expected_char != recognized_char),
+            ))
+        previous = current
+    return max(0.0, 1 - previous[-1] / len(expected))
+
+def measure(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Time fn() and return summary statistics in seconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "repeat": repeat,
+    }
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of a list of latencies"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def at(fraction: float) -> float:
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "p50": at(0.50),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "mean": statistics.mean(ordered),
+        "max": ordered[-1],
+        "count": len(ordered),
+    }
+
+def environment() -> Dict[str, str]:
+    """Where a result came from: commit, interpreter and machine"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+def emit(benchmark: str, results: Dict):
+    """Print results as one JSON document so runs can be diffed (see benchmarks.compare)"""
+    document = {"benchmark": benchmark, "environment": environment(), "results": results}
+    json.dump(document, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
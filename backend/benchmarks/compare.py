@@ -0,0 +1,67 @@
+"""Compare two saved benchmark runs.
+
+Flattens the numeric results of two JSON files written by any benchmark
+(python -m benchmarks.bench_pipeline > before.json) and prints each value
+side by side with its relative change, largest changes first.
+
+    python -m benchmarks.compare before.json after.json [--threshold 0.05]
+"""
+import argparse
+import json
+from typing import Dict
+
+def flatten(value, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a nested result as {"a.b.c": value}"""
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: float(value)}
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.0, help="hide relative changes smaller than this")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    if before.get("benchmark") != after.get("benchmark"):
+        raise SystemExit(f"Different benchmarks: {before.get('benchmark')} and {after.get('benchmark')}")
+    for label, run in (("before", before), ("after", after)):
+        environment = run.get("environment", {})
+        print(f"{label}: commit {environment.get('commit')} at {environment.get('timestamp')}")
+
+    old, new = flatten(before["results"]), flatten(after["results"])
+    rows = []
+    for key in sorted(set(old) | set(new)):
+        if key not in old or key not in new:
+            rows.append((float("inf"), key, old.get(key), new.get(key)))
+            continue
+        change = (new[key] - old[key]) / abs(old[key]) if old[key] else (0.0 if not new[key] else float("inf"))
+        if abs(change) >= args.threshold:
+            rows.append((change, key, old[key], new[key]))
+
+    rows.sort(key=lambda row: -abs(row[0]))
+    width = max((len(row[1]) for row in rows), default=0)
+    for change, key, old_value, new_value in rows:
+        change_text = "n/a" if change == float("inf") else f"{change:+.1%}"
+        old_text = "-" if old_value is None else f"{old_value:.6g}"
+        new_text = "-" if new_value is None else f"{new_value:.6g}"
+        print(f"{key:<{width}}  {old_text:>12}  {new_text:>12}  {change_text:>8}")
+
+if __name__ == "__main__":
+    main()
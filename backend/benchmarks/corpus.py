@@ -0,0 +1,116 @@
+"""Deterministic synthetic document corpus for the pipeline and API benchmarks.
+
+Generates scanned-style PDFs of several page counts (rendered pages with
+slight skew and noise, no text layer), born-digital PDFs, PNG and JPEG
+scans and plain text files, plus a manifest.json with each file's content
+type, page count and ground-truth text. The same seed always produces the
+same corpus.
+
+    python -m benchmarks.corpus OUTPUT_DIR [--seed 0] [--page-counts 1 5 20]
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List
+from PIL import Image, ImageFilter
+from benchmarks.common import render_text_page, text_pdf
+
+MANIFEST = "manifest.json"
+
+VENDORS = ["Acme Corporation", "Globex Ltd", "Initech", "Umbrella Supplies", "Stark Industries"]
+ITEMS = ["Consulting services", "Travel expenses", "Software licence", "Hardware", "Support plan"]
+
+def invoice_lines(rng: random.Random, number: int) -> List[str]:
+    """One page of invoice-like text with a few key/value pairs, dates and amounts"""
+    lines = [
+        "INVOICE",
+        f"Invoice Number: INV-{100000 + number}",
+        f"Date: {rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2019, 2024)}",
+        f"Bill To: {rng.choice(VENDORS)}",
+    ]
+    subtotal = 0.0
+    for item in rng.sample(ITEMS, 3):
+        amount = rng.randint(50, 5000) + rng.randint(0, 99) / 100
+        subtotal += amount
+        lines.append(f"{item}   ${amount:.2f}")
+    tax = round(subtotal * 0.1, 2)
+    lines += [f"Subtotal: ${subtotal:.2f}", f"Tax = ${tax:.2f}", f"Total Due: ${subtotal + tax:.2f}"]
+    return lines
+
+def scan(page: Image.Image, rng: random.Random) -> Image.Image:
+    """Make a clean render look like a flatbed scan: skew, blur and grey paper"""
+    page = page.rotate(rng.uniform(-1.5, 1.5), resample=Image.BICUBIC, fillcolor="white")
+    gray = page.convert("L").filter(ImageFilter.GaussianBlur(0.6))
+    return gray.point(lambda level: 25 + level * 215 // 255)
+
+def generate_corpus(directory: str, seed: int = 0, page_counts: List[int] = (1, 5, 20),
+                    images: int = 4, texts: int = 4) -> List[Dict]:
+    """Write the corpus to directory and return its manifest entries"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    number = 0
+
+    def add(filename: str, content_type: str, pages: List[List[str]]):
+        entries.append({
+            "filename": filename,
+            "content_type": content_type,
+            "pages": len(pages),
+            "text": ["\n".join(lines) for lines in pages],
+        })
+
+    for page_count in page_counts:
+        pages = []
+        for _ in range(page_count):
+            pages.append(invoice_lines(rng, number))
+            number += 1
+        scanned = [scan(render_text_page(lines), rng) for lines in pages]
+        filename = f"scanned_{page_count}p.pdf"
+        scanned[0].save(os.path.join(directory, filename), format="PDF", save_all=True,
+                        append_images=scanned[1:], resolution=300)
+        add(filename, "application/pdf", pages)
+
+        filename = f"digital_{page_count}p.pdf"
+        with open(os.path.join(directory, filename), "wb") as f:
+            f.write(text_pdf(pages))
+        add(filename, "application/pdf", pages)
+
+    for i in range(images):
+        lines = invoice_lines(rng, number)
+        number += 1
+        image_format, content_type = ("PNG", "image/png") if i % 2 == 0 else ("JPEG", "image/jpeg")
+        filename = f"scan_{i}.{image_format.lower().replace('jpeg', 'jpg')}"
+        scan(render_text_page(lines), rng).save(os.path.join(directory, filename), format=image_format)
+        add(filename, content_type, [lines])
+
+    for i in range(texts):
+        lines = invoice_lines(rng, number)
+        number += 1
+        filename = f"note_{i}.txt"
+        with open(os.path.join(directory, filename), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        add(filename, "text/plain", [lines])
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "documents": entries}, f, indent=2)
+    return entries
+
+def load_corpus(directory: str) -> List[Dict]:
+    """Manifest entries of a generated corpus"""
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)["documents"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--page-counts", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--texts", type=int, default=4)
+    args = parser.parse_args()
+    entries = generate_corpus(args.output, args.seed, args.page_counts, args.images, args.texts)
+    print(f"Wrote {len(entries)} documents to {args.output}")
+
+if __name__ == "__main__":
+    main()
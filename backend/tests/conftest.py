@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Settings has no defaults for these; tests never connect to them
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
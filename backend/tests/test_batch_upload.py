@@ -0,0 +1,41 @@
+import asyncio
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from app.models.document import DocumentStatus
+from app.processing.jobs import JOBS_COLLECTION, new_job
+from app.routes import documents
+
+def test_failed_inserts_are_reported_and_cleaned_up(monkeypatch):
+    db = AsyncMongoMockClient().db
+    taken = ObjectId()
+    ids = iter([ObjectId(), taken, ObjectId()])
+    deleted = []
+
+    async def ingest_document(db, owner_id, filename, content_type, chunks):
+        document_id = next(ids)
+        record = {"_id": document_id, "filename": filename, "owner_id": owner_id,
+                  "status": DocumentStatus.UPLOADED.value}
+        return record, new_job(str(document_id), content_type, owner_id=owner_id)
+
+    async def delete_document_file(document_id):
+        deleted.append(document_id)
+
+    monkeypatch.setattr(documents, "ingest_document", ingest_document)
+    monkeypatch.setattr(documents, "delete_document_file", delete_document_file)
+
+    async def members():
+        for name in ("a.txt", "b.txt", "c.txt"):
+            yield name, "text/plain", None
+
+    async def run():
+        await db["documents"].insert_one({"_id": taken})
+        return await documents.ingest_batch(db, "owner", members())
+
+    result = asyncio.run(run())
+    assert result["uploaded"] == 2
+    assert result["failed"] == 1
+    assert result["documents"][1] == {"filename": "b.txt", "error": "Error uploading document"}
+    assert "id" in result["documents"][0] and "id" in result["documents"][2]
+    assert deleted == [str(taken)]
+    jobs = asyncio.run(db[JOBS_COLLECTION].distinct("document_id"))
+    assert str(taken) not in jobs and len(jobs) == 2
@@ -0,0 +1,54 @@
+import asyncio
+import mongomock
+from mongomock_motor import AsyncMongoMockClient
+from app.core.config import settings
+from app.processing import ocr
+from app.processing.cache import (
+    ENGINE_VERSIONS_COLLECTION, RESULT_CACHE_COLLECTION, ResultCache, record_engine_version
+)
+from app.processing.ocr import ocr_settings_key
+
+class BrokenDatabase:
+    def __getitem__(self, name):
+        raise ConnectionError("MongoDB is down")
+
+def test_result_round_trip():
+    db = mongomock.MongoClient().db
+    cache = ResultCache(memory_entries=0, ttl_seconds=60)
+    assert cache.get_sync(db, "abc") is None
+    cache.put_sync(db, "abc", {"full_text": "hello"})
+    assert cache.get_sync(db, "abc") == {"full_text": "hello"}
+    assert cache.stats()["db_hits"] == 1
+
+def test_lookup_errors_are_misses():
+    cache = ResultCache(memory_entries=0, ttl_seconds=60)
+    assert cache.get_sync(BrokenDatabase(), "abc") is None
+    assert cache.stats()["misses"] == 1
+
+def test_key_includes_the_detected_engine_version(monkeypatch):
+    monkeypatch.setattr(ocr, "ocr_engine_version", lambda: "tesserocr-5.3.4")
+    key = ocr_settings_key()
+    assert key.startswith("tesserocr-5.3.4:")
+    monkeypatch.setattr(ocr, "ocr_engine_version", lambda: "tesserocr-5.4.0")
+    assert ocr_settings_key() != key
+
+def test_api_lookup_uses_the_version_workers_recorded(monkeypatch):
+    monkeypatch.setattr(ocr, "ocr_engine_version", lambda: "unknown")
+    db = AsyncMongoMockClient().db
+    cache = ResultCache(memory_entries=0, ttl_seconds=60)
+
+    async def run():
+        # No worker has started yet
+        assert await cache.get(db, "abc") is None
+        await db[ENGINE_VERSIONS_COLLECTION].insert_one({"_id": settings.ocr_engine, "version": "tesserocr-5.3.4"})
+        entry = cache._entry(cache.key("abc", "tesserocr-5.3.4"), "abc", {"full_text": "hello"})
+        await db[RESULT_CACHE_COLLECTION].insert_one({"_id": cache.key("abc", "tesserocr-5.3.4"), **entry})
+        return await cache.get(db, "abc")
+
+    assert asyncio.run(run()) == {"full_text": "hello"}
+
+def test_worker_records_its_engine_version(monkeypatch):
+    monkeypatch.setattr("app.processing.cache.ocr_engine_version", lambda: "tesserocr-5.3.4")
+    db = mongomock.MongoClient().db
+    record_engine_version(db)
+    assert db[ENGINE_VERSIONS_COLLECTION].find_one({"_id": settings.ocr_engine})["version"] == "tesserocr-5.3.4"
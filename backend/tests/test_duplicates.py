@@ -0,0 +1,71 @@
+import io
+import itertools
+import random
+import mongomock
+import pytest
+from PIL import Image
+from app.core.config import settings
+from app.processing import duplicates
+from app.processing.duplicates import HASH_BITS, PageHashIndex, hamming, hash_bands, page_hash
+from benchmarks.common import render_text_page
+from app.processing.texts import store_texts_sync
+from benchmarks.corpus import invoice_lines, scan
+
+THRESHOLD = settings.duplicate_hash_threshold
+
+def invoice_page(number: int) -> Image.Image:
+    # Half of A4 at 300 DPI; every page comes from the same invoice template
+    return render_text_page(invoice_lines(random.Random(number), number)).reduce(2)
+
+@pytest.fixture
+def database(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(duplicates, "get_sync_database", lambda: db)
+    return db
+
+def test_unrelated_pages_are_not_near_duplicates():
+    hashes = [page_hash(invoice_page(number)) for number in range(12)]
+    distances = [hamming(a, b) for a, b in itertools.combinations(hashes, 2)]
+    assert min(distances) > THRESHOLD
+
+def test_reencoded_page_is_a_near_duplicate():
+    page = invoice_page(0)
+    buffer = io.BytesIO()
+    page.save(buffer, "JPEG", quality=75)
+    copy = Image.open(io.BytesIO(buffer.getvalue()))
+    assert hamming(page_hash(page), page_hash(copy)) <= THRESHOLD
+
+def test_rescanned_page_is_a_near_duplicate():
+    rng = random.Random(0)
+    for number in range(5):
+        page = invoice_page(number)
+        assert hamming(page_hash(page), page_hash(scan(page, rng))) <= THRESHOLD
+
+def test_hashes_within_threshold_share_a_band():
+    rng = random.Random(0)
+    for _ in range(100):
+        value = rng.getrandbits(HASH_BITS)
+        other = value
+        for bit in rng.sample(range(HASH_BITS), THRESHOLD):
+            other ^= 1 << bit
+        assert set(hash_bands(value, THRESHOLD + 1)) & set(hash_bands(other, THRESHOLD + 1))
+
+def test_index_flags_only_the_copy(database):
+    for number in range(5):
+        index = PageHashIndex("owner", f"doc{number}", THRESHOLD, THRESHOLD + 1)
+        index.check_page(invoice_page(number), 1)
+    assert database[duplicates.PAGE_HASHES_COLLECTION].count_documents({"duplicate_of": {"$exists": True}}) == 0
+
+    copy = PageHashIndex("owner", "copy", THRESHOLD, THRESHOLD + 1)
+    copy.check_page(invoice_page(3).convert("L"), 1)
+    record = database[duplicates.PAGE_HASHES_COLLECTION].find_one({"document_id": "copy"})
+    assert record["duplicate_of"]["document_id"] == "doc3"
+
+def test_reuse_returns_the_matched_page_text(database, monkeypatch):
+    monkeypatch.setattr(settings, "duplicate_reuse_ocr", True)
+    original = PageHashIndex("owner", "original", THRESHOLD, THRESHOLD + 1)
+    assert original.check_page(invoice_page(1), 1) is None
+    store_texts_sync(database, "original", "owner", [{"page": 1, "text": "INVOICE 1"}])
+
+    rescan = PageHashIndex("owner", "rescan", THRESHOLD, THRESHOLD + 1)
+    assert rescan.check_page(scan(invoice_page(1), random.Random(1)), 1) == "INVOICE 1"
@@ -0,0 +1,33 @@
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.core.security import get_current_user
+from app.main import app
+from app.models.document import DocumentStatus
+from app.processing.search import SEARCH_FIELDS
+
+def test_get_document_returns_the_document_record(monkeypatch):
+    db = AsyncMongoMockClient().db
+    monkeypatch.setattr(database, "db", db)
+    document_id = ObjectId()
+    asyncio.run(db["documents"].insert_one({
+        "_id": document_id, "filename": "invoice.txt", "content_type": "text/plain", "size": 10,
+        "upload_date": datetime(2024, 1, 2),
+        "owner_id": "owner", "status": DocumentStatus.COMPLETED.value,
+        "extracted_data": {"key_value_pairs": {"invoice_number": "INV-1"}},
+        SEARCH_FIELDS: ["invoice_number=inv-1"], "processed_pages": 1, "total_pages": 1,
+    }))
+    app.dependency_overrides[get_current_user] = lambda: "owner"
+    try:
+        response = TestClient(app).get(f"/api/{document_id}")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == str(document_id)
+    assert body["extracted_data"]["key_value_pairs"] == {"invoice_number": "INV-1"}
+    assert SEARCH_FIELDS not in body
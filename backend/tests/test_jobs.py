@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+import mongomock
+import pytest
+from bson import ObjectId
+from app.models.document import DocumentStatus
+from app.models.job import JobStatus
+from app.processing import worker
+from app.processing.jobs import JobQueue, PermanentJobError, new_job
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+@pytest.fixture
+def queue(db):
+    return JobQueue(db["jobs"], lease_seconds=60, max_attempts=2)
+
+def add_job(queue, document_id=None, **fields) -> ObjectId:
+    job = new_job(document_id or str(ObjectId()), "application/pdf", owner_id="owner")
+    job.update(fields)
+    return queue.collection.insert_one(job).inserted_id
+
+def expire_lease(queue, job_id):
+    queue.collection.update_one(
+        {"_id": job_id}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+def test_claim_takes_oldest_runnable_job_once(db, queue):
+    now = datetime.utcnow()
+    newer = add_job(queue, available_at=now - timedelta(seconds=1))
+    older = add_job(queue, available_at=now - timedelta(seconds=10))
+    add_job(queue, available_at=now + timedelta(hours=1))
+
+    job = queue.claim("w1")
+    assert job["_id"] == older
+    assert job["status"] == JobStatus.RUNNING.value
+    assert job["attempts"] == 1
+    assert job["worker_id"] == "w1"
+    assert queue.claim("w2")["_id"] == newer
+    assert queue.claim("w3") is None
+
+def test_expired_lease_is_claimed_again(db, queue):
+    job_id = add_job(queue)
+    first = queue.claim("w1")
+    assert queue.claim("w2") is None
+
+    expire_lease(queue, job_id)
+    second = queue.claim("w2")
+    assert second["_id"] == job_id
+    assert second["worker_id"] == "w2"
+    assert second["attempts"] == 2
+    # The first worker lost its lease and cannot finish the job any more
+    assert not queue.heartbeat(first)
+
+def test_failed_job_is_retried_after_backoff_until_attempts_run_out(db, queue):
+    job_id = add_job(queue)
+    job = queue.claim("w1")
+    assert queue.fail(job, "timeout")
+    stored = queue.collection.find_one({"_id": job_id})
+    assert stored["status"] == JobStatus.QUEUED.value
+    assert stored["available_at"] > datetime.utcnow()
+    assert queue.claim("w1") is None
+
+    queue.collection.update_one({"_id": job_id}, {"$set": {"available_at": datetime.utcnow()}})
+    job = queue.claim("w1")
+    assert not queue.fail(job, "timeout again")
+    stored = queue.collection.find_one({"_id": job_id})
+    assert stored["status"] == JobStatus.FAILED.value
+    assert stored["finished_at"] is not None
+
+def test_non_retryable_failure_fails_at_once(db, queue):
+    job_id = add_job(queue)
+    job = queue.claim("w1")
+    assert not queue.fail(job, "Unsupported file type", retryable=False)
+    stored = queue.collection.find_one({"_id": job_id})
+    assert stored["status"] == JobStatus.FAILED.value
+    assert stored["attempts"] == 1
+
+def test_complete_sets_finished_at(db, queue):
+    job_id = add_job(queue)
+    queue.complete(queue.claim("w1"))
+    stored = queue.collection.find_one({"_id": job_id})
+    assert stored["status"] == JobStatus.SUCCEEDED.value
+    assert stored["finished_at"] is not None
+
+def test_reap_fails_expired_jobs_without_attempts_left(db, queue):
+    exhausted = add_job(queue, attempts=1)
+    retryable = add_job(queue)
+    queue.claim("w1")
+    queue.claim("w2")
+    expire_lease(queue, exhausted)
+    expire_lease(queue, retryable)
+
+    reaped = queue.reap_abandoned()
+    assert [job["_id"] for job in reaped] == [exhausted]
+    assert queue.collection.find_one({"_id": exhausted})["status"] == JobStatus.FAILED.value
+    assert queue.collection.find_one({"_id": retryable})["status"] == JobStatus.RUNNING.value
+
+def test_worker_does_not_retry_permanent_errors(db, queue, monkeypatch):
+    document_id = db["documents"].insert_one({"status": DocumentStatus.UPLOADED.value}).inserted_id
+    job_id = add_job(queue, document_id=str(document_id))
+
+    def process_job(db, job):
+        raise PermanentJobError("Unsupported file type: application/zip")
+
+    monkeypatch.setattr(worker, "process_job", process_job)
+    assert worker.run_one(db, queue, "w1")
+    assert queue.collection.find_one({"_id": job_id})["status"] == JobStatus.FAILED.value
+    assert db["documents"].find_one({"_id": document_id})["status"] == DocumentStatus.FAILED.value
@@ -0,0 +1,50 @@
+from app.processing.kv_extraction import extract_pairs
+from benchmarks.bench_kv_extraction import legacy_extract_key_value_pairs
+from benchmarks.common import SAMPLE_LINES
+
+INVOICE = "\n".join(SAMPLE_LINES)
+
+RECEIPT = """CORNER MARKET
+Store 0142
+Date: 01/18/2021
+Milk 2L                 $3.49
+Bread                   $2.99
+Subtotal: $6.48
+Tax: $0.52
+Total: $7.00
+Cash: $10.00
+Change: $3.00
+Thank you for shopping"""
+
+def differences(legacy, new):
+    return {key: (legacy.get(key), new.get(key)) for key in legacy.keys() | new.keys() if legacy.get(key) != new.get(key)}
+
+def test_invoice_matches_the_legacy_extractor():
+    legacy = legacy_extract_key_value_pairs(INVOICE)
+    new = extract_pairs(INVOICE, "invoice")
+
+    assert new["extracted_dates"] == legacy["extracted_dates"]
+    assert new["extracted_amounts"] == legacy["extracted_amounts"]
+    # Every other difference is a legacy key running across a line break,
+    # a colon line split again on its first space, or a separator left in
+    # the value
+    assert differences(legacy, new) == {
+        "INVOICE\nInvoice Number": ("INV-104233", None),
+        "Invoice Number": (None, "INV-104233"),
+        "Invoice": ("Number: INV-104233", None),
+        "Bill": ("To: Acme Corporation", None),
+        "Total": ("Due: $1663.75", None),
+        "Description                Qty      Amount\nConsulting services": ("4     $1200.00", None),
+        "Consulting services": (None, "4     $1200.00"),
+        "Description                Qty": (None, "Amount"),
+        "Tax": ("= $151.25", "$151.25"),
+    }
+
+def test_receipt_matches_the_legacy_extractor():
+    legacy = legacy_extract_key_value_pairs(RECEIPT)
+    new = extract_pairs(RECEIPT, "receipt")
+
+    assert new["extracted_dates"] == legacy["extracted_dates"]
+    assert new["extracted_amounts"] == legacy["extracted_amounts"]
+    # The legacy line rule needed a preceding newline, so it never saw the first line
+    assert differences(legacy, new) == {"CORNER": (None, "MARKET")}
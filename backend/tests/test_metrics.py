@@ -0,0 +1,34 @@
+import asyncio
+import time
+from app.core import metrics as core_metrics
+from app.utils.metrics import Registry
+
+def test_callback_counter_renders_as_counter():
+    registry = Registry()
+    registry.counter("hits_total", "Hits", ["cache"], lambda: {("result",): 3})
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)).observe(0.5)
+    text = registry.render()
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{cache="result"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert "latency_seconds_count 1" in text
+
+class HangingCollection:
+    async def count_documents(self, query, **kwargs):
+        await asyncio.sleep(60)
+
+class HangingDatabase:
+    def __getitem__(self, name):
+        return HangingCollection()
+
+def test_queue_monitor_gives_up_on_a_hanging_database():
+    async def run():
+        task = asyncio.create_task(core_metrics.monitor_queue(HangingDatabase(), interval=0.01, timeout=0.05))
+        await asyncio.sleep(0.2)
+        assert not task.done()
+        task.cancel()
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,71 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from app.core.config import settings
+from app.processing import ocr
+
+def test_page_pool_gets_the_whole_core_budget(monkeypatch):
+    monkeypatch.setattr(ocr.os, "cpu_count", lambda: 32)
+    monkeypatch.setattr(settings, "ocr_workers", 0)
+    monkeypatch.setattr(settings, "ocr_tesseract_threads", 1)
+    assert ocr.ocr_worker_count() == 32
+    monkeypatch.setattr(settings, "ocr_tesseract_threads", 2)
+    assert ocr.ocr_worker_count() == 16
+    monkeypatch.setattr(settings, "ocr_workers", 4)
+    assert ocr.ocr_worker_count() == 4
+
+def test_large_scan_takes_the_parallel_path_by_default(monkeypatch):
+    monkeypatch.setattr(ocr.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(ocr, "pdf_text_layer", lambda path: [None] * 10)
+    calls = []
+
+    def ocr_pdf_parallel(pdf_path, page_numbers, page_index=None):
+        calls.append(page_numbers)
+        return iter(f"page {number}" for number in page_numbers)
+
+    monkeypatch.setattr(ocr, "ocr_pdf_parallel", ocr_pdf_parallel)
+    texts = list(ocr.iter_pdf_texts("scan.pdf", lambda count: None))
+    assert calls == [list(range(1, 11))]
+    assert texts[-1] == (10, "page 10")
+
+def test_parallel_pages_only_borrow_free_core_slots(monkeypatch):
+    monkeypatch.setattr(ocr.os, "cpu_count", lambda: 4)
+    slots = threading.BoundedSemaphore(4)
+    monkeypatch.setattr(ocr, "_core_slots", slots)
+    monkeypatch.setattr(ocr, "get_page_pool", lambda: ThreadPoolExecutor(8))
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def ocr_pdf_page(pdf_path, page_number, options, page_index=None):
+        with lock:
+            running.append(page_number)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(page_number)
+        return f"page {page_number}", "ocr", 0.0, 0.0
+
+    monkeypatch.setattr(ocr, "_ocr_pdf_page", ocr_pdf_page)
+    slots.acquire()  # busy with another worker's job
+    with ocr.core_slot():
+        texts = list(ocr.ocr_pdf_parallel("scan.pdf", list(range(1, 9))))
+    assert texts == [f"page {number}" for number in range(1, 9)]
+    # This worker's own slot plus the two that were free
+    assert max(peak) == 3
+    assert [slots.acquire(False) for _ in range(4)] == [True, True, True, False]
+
+def test_pnm_stream_is_split_into_pages():
+    first = Image.new("L", (3, 2), 40)
+    second = Image.new("RGB", (2, 4), (1, 2, 3))
+    stream = b""
+    for image in (first, second):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PPM")
+        stream += buffer.getvalue()
+    pages = list(ocr.iter_pnm_images(stream))
+    assert [(page.mode, page.size) for page in pages] == [("L", (3, 2)), ("RGB", (2, 4))]
+    assert pages[0].getpixel((0, 0)) == 40
+    assert pages[1].getpixel((1, 3)) == (1, 2, 3)
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.core.security import get_current_user
+from app.main import app
+from app.models.document import DocumentStatus
+from app.processing.typed_fields import TYPED_FIELDS
+from app.utils.helpers import decode_cursor, encode_cursor
+
+UPLOADED = datetime(2024, 5, 1, 12, 30, 15, 123000)
+
+@pytest.fixture
+def client(monkeypatch):
+    db = AsyncMongoMockClient().db
+    monkeypatch.setattr(database, "db", db)
+    app.dependency_overrides[get_current_user] = lambda: "owner"
+    yield TestClient(app), db
+    app.dependency_overrides.clear()
+
+def document(upload_date: datetime, status: DocumentStatus = DocumentStatus.COMPLETED,
+             invoice_date: datetime = datetime(2024, 4, 1)):
+    return {
+        "_id": ObjectId(), "filename": "invoice.pdf", "content_type": "application/pdf", "size": 1,
+        "upload_date": upload_date, "owner_id": "owner", "status": status.value,
+        TYPED_FIELDS: [{"kind": "date", "value": invoice_date}],
+    }
+
+def walk(client: TestClient, limit: int, **params):
+    """Every page of the listing; returns the ids in order and the number of pages"""
+    ids = []
+    pages = 0
+    params = dict(params, limit=limit)
+    while True:
+        response = client.get("/api/", params=params)
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+        params["cursor"] = cursor
+
+def test_cursor_round_trip():
+    id = ObjectId()
+    assert decode_cursor(encode_cursor(UPLOADED, id)) == (UPLOADED, id)
+
+def test_tampered_cursor_is_rejected(client):
+    http, _ = client
+    cursor = encode_cursor(UPLOADED, ObjectId())
+    for tampered in (cursor[:-3], cursor + "x!", "not-a-cursor"):
+        with pytest.raises(ValueError):
+            decode_cursor(tampered)
+        assert http.get("/api/", params={"cursor": tampered}).status_code == 400
+
+def test_documents_with_equal_upload_dates_are_listed_once(client):
+    http, db = client
+    # Seven documents share one upload date; the others are older
+    records = [document(UPLOADED) for _ in range(7)]
+    records += [document(UPLOADED - timedelta(seconds=i + 1)) for i in range(3)]
+    asyncio.run(db["documents"].insert_many(records))
+
+    ids, pages = walk(http, limit=3)
+    expected = sorted(records, key=lambda record: (record["upload_date"], record["_id"]), reverse=True)
+    assert ids == [str(record["_id"]) for record in expected]
+    assert pages == 4
+
+def test_ties_are_paginated_within_status_and_typed_filters(client):
+    http, db = client
+    march = datetime(2024, 3, 15)
+    matching = [document(UPLOADED, invoice_date=march) for _ in range(5)]
+    others = [document(UPLOADED, DocumentStatus.FAILED, march) for _ in range(3)]
+    others += [document(UPLOADED) for _ in range(3)]
+    asyncio.run(db["documents"].insert_many(matching + others))
+
+    ids, _ = walk(http, limit=2, status="COMPLETED", date_from="2024-03-01T00:00:00", date_to="2024-03-31T00:00:00")
+    assert ids == [str(record["_id"]) for record in sorted(matching, key=lambda r: r["_id"], reverse=True)]
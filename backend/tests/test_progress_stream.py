@@ -0,0 +1,59 @@
+import asyncio
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.main import app
+from app.models.document import DocumentStatus
+
+def test_progress_event_is_sent_before_the_stream_ends(monkeypatch):
+    db = AsyncMongoMockClient().db
+    monkeypatch.setattr(database, "db", db)
+    monkeypatch.setattr(settings, "progress_stream_poll_seconds", 0.01)
+    app.dependency_overrides[get_current_user] = lambda: "owner"
+    document_id = ObjectId()
+
+    async def run():
+        await db["documents"].insert_one({
+            "_id": document_id, "owner_id": "owner", "status": DocumentStatus.PROCESSING.value,
+            "processed_pages": 1, "total_pages": 3,
+        })
+        messages = []
+        first_event = asyncio.Event()
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if b"data:" in message.get("body", b""):
+                first_event.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/{document_id}/progress", "raw_path": b"", "query_string": b"",
+            # EventSource in browsers asks for gzip
+            "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip, deflate")],
+            "client": ("127.0.0.1", 1), "server": ("test", 80), "root_path": "",
+        }
+        task = asyncio.create_task(app(scope, receive, send))
+        try:
+            await asyncio.wait_for(first_event.wait(), timeout=5)
+            assert not task.done()
+        finally:
+            await db["documents"].update_one({"_id": document_id}, {"$set": {"status": DocumentStatus.COMPLETED.value}})
+            await asyncio.wait_for(task, timeout=5)
+        return messages
+
+    try:
+        messages = asyncio.run(run())
+    finally:
+        app.dependency_overrides.clear()
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    assert b"content-encoding" not in headers
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    assert body.count(b"event: progress") == 2
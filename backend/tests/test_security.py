@@ -0,0 +1,57 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database, security
+from app.core.config import settings
+from app.core.security import (
+    REVOKED_TOKENS_COLLECTION, create_access_token, get_current_user, revoke_token, token_cache
+)
+
+@pytest.fixture
+def db(monkeypatch):
+    db = AsyncMongoMockClient().db
+    monkeypatch.setattr(database, "db", db)
+    token_cache.clear()
+    yield db
+    token_cache.clear()
+
+def test_cached_token_never_outlives_its_exp():
+    assert security._cache_ttl({"exp": time.time() + 10}) <= 10
+    assert security._cache_ttl({"exp": time.time() + 10 ** 6}) == settings.token_cache_ttl_seconds
+    assert security._cache_ttl({"exp": time.time() - 1}) < 0
+
+def test_validated_token_is_served_from_the_cache(db):
+    token = create_access_token({"sub": "alice"}, timedelta(minutes=5))
+    hits = token_cache.hits
+    assert asyncio.run(get_current_user(token)) == "alice"
+    assert asyncio.run(get_current_user(token)) == "alice"
+    assert token_cache.hits == hits + 1
+
+def test_expired_token_is_refused(db):
+    token = create_access_token({"sub": "alice"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_user(token))
+    assert error.value.status_code == 401
+
+def test_revoked_token_is_refused_by_every_process(db):
+    token = create_access_token({"sub": "alice"}, timedelta(minutes=5))
+    other = create_access_token({"sub": "alice"}, timedelta(minutes=5))
+    assert asyncio.run(get_current_user(token)) == "alice"
+    asyncio.run(revoke_token(token))
+
+    with pytest.raises(HTTPException):
+        asyncio.run(get_current_user(token))
+    # A process that never cached the token checks MongoDB too
+    token_cache.clear()
+    with pytest.raises(HTTPException):
+        asyncio.run(get_current_user(token))
+    assert asyncio.run(get_current_user(other)) == "alice"
+
+    claims = jwt.get_unverified_claims(token)
+    record = asyncio.run(db[REVOKED_TOKENS_COLLECTION].find_one({"_id": claims["jti"]}))
+    # Kept exactly as long as the token itself is valid
+    assert record["expires_at"] == datetime.utcfromtimestamp(claims["exp"])
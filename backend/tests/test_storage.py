@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import io
+import pytest
+from app.utils.storage import LocalStorage, S3Storage
+
+async def chunks_of(*chunks, fail=False):
+    for chunk in chunks:
+        yield chunk
+    if fail:
+        raise ConnectionError("client went away")
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls S3Storage makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        del self.uploads[UploadId]
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[(Bucket, Key)]
+        if Range is not None:
+            first, last = Range[len("bytes="):].split("-")
+            data = data[int(first):int(last) + 1 if last else None]
+        return {"Body": io.BytesIO(data)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def head_object(self, Bucket, Key):
+        from botocore.exceptions import ClientError
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    def download_file(self, Bucket, Key, Filename):
+        with open(Filename, "wb") as f:
+            f.write(self.objects[(Bucket, Key)])
+
+def test_local_files_are_fanned_out_and_read_by_range(tmp_path):
+    storage = LocalStorage(tmp_path)
+    asyncio.run(storage.write_stream("doc1", chunks_of(b"hello ", b"world")))
+
+    path = storage.path_for("doc1")
+    assert path.parent.parent.parent == tmp_path
+    assert len(path.parent.name) == 2 and len(path.parent.parent.name) == 2
+    assert path.read_bytes() == b"hello world"
+    assert asyncio.run(storage.read("doc1")) == b"hello world"
+    assert asyncio.run(storage.read("doc1", 6)) == b"world"
+    assert asyncio.run(storage.read("doc1", 2, 5)) == b"llo"
+    assert asyncio.run(storage.read("doc1", 5, 2)) == b""
+    with storage.local_file("doc1") as local_path:
+        assert local_path == str(path)
+
+    asyncio.run(storage.delete("doc1"))
+    assert not asyncio.run(storage.exists("doc1"))
+    with pytest.raises(FileNotFoundError):
+        with storage.local_file("doc1"):
+            pass
+
+def test_failed_local_write_keeps_the_previous_file(tmp_path):
+    storage = LocalStorage(tmp_path)
+    asyncio.run(storage.write("doc1", b"version 1"))
+    with pytest.raises(ConnectionError):
+        asyncio.run(storage.write_stream("doc1", chunks_of(b"version 2, half", fail=True)))
+
+    assert asyncio.run(storage.read("doc1")) == b"version 1"
+    assert list(storage.path_for("doc1").parent.glob("*.part")) == []
+
+def test_local_files_from_before_the_fan_out_are_found(tmp_path):
+    storage = LocalStorage(tmp_path)
+    (tmp_path / "legacy").write_bytes(b"old layout")
+
+    assert asyncio.run(storage.exists("legacy"))
+    assert asyncio.run(storage.read("legacy", 4)) == b"layout"
+    with storage.local_file("legacy") as path:
+        assert path == str(tmp_path / "legacy")
+    asyncio.run(storage.delete("legacy"))
+    assert not (tmp_path / "legacy").exists()
+
+def test_s3_streams_in_parts_and_reads_ranges(monkeypatch):
+    client = FakeS3()
+    storage = S3Storage("bucket", prefix="documents/", client=client)
+    monkeypatch.setattr(storage, "PART_SIZE", 4)
+    asyncio.run(storage.write_stream("doc1", chunks_of(b"hello", b" wor", b"ld")))
+
+    assert client.objects == {("bucket", "documents/doc1"): b"hello world"}
+    assert client.uploads == {}
+    assert asyncio.run(storage.read("doc1")) == b"hello world"
+    assert asyncio.run(storage.read("doc1", 6)) == b"world"
+    assert asyncio.run(storage.read("doc1", 2, 5)) == b"llo"
+    assert asyncio.run(storage.read("doc1", 5, 5)) == b""
+    with storage.local_file("doc1") as path:
+        with open(path, "rb") as f:
+            assert f.read() == b"hello world"
+
+    asyncio.run(storage.delete("doc1"))
+    assert client.objects == {}
+
+def test_s3_empty_stream_still_creates_the_object():
+    client = FakeS3()
+    asyncio.run(S3Storage("bucket", client=client).write("empty", b""))
+    assert client.objects == {("bucket", "empty"): b""}
+
+def test_failed_s3_upload_is_aborted():
+    client = FakeS3()
+    storage = S3Storage("bucket", client=client)
+    with pytest.raises(ConnectionError):
+        asyncio.run(storage.write_stream("doc1", chunks_of(b"partial", fail=True)))
+    assert client.objects == {}
+    assert client.uploads == {}
+
+def test_s3_exists():
+    pytest.importorskip("botocore")
+    client = FakeS3()
+    storage = S3Storage("bucket", client=client)
+    asyncio.run(storage.write("doc1", b"data"))
+    assert asyncio.run(storage.exists("doc1"))
+    assert not asyncio.run(storage.exists("doc2"))
@@ -0,0 +1,56 @@
+from datetime import datetime
+from decimal import Decimal
+from bson.decimal128 import Decimal128
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from app.core import database
+from app.core.config import settings
+from app.core.security import get_current_user
+from app.main import app
+from app.processing.kv_extraction import extract_pairs
+from app.processing.typed_fields import build_typed_fields, parse_amount, parse_date
+
+def test_dates_follow_the_configured_order(monkeypatch):
+    monkeypatch.setattr(settings, "date_order", "MDY")
+    assert parse_date("03/04/2024") == datetime(2024, 3, 4)
+    assert parse_date("3-4-2024") == datetime(2024, 3, 4)
+    monkeypatch.setattr(settings, "date_order", "DMY")
+    assert parse_date("03/04/2024") == datetime(2024, 4, 3)
+
+def test_two_digit_years_map_to_the_nearest_century():
+    assert parse_date("01/02/24") == datetime(2024, 1, 2)
+    assert parse_date("01/02/69") == datetime(2069, 1, 2)
+    assert parse_date("01/02/70") == datetime(1970, 1, 2)
+
+def test_invalid_dates_are_left_out():
+    assert parse_date("13/13/2024") is None
+    assert parse_date("02/30/2024") is None
+    assert parse_date("01/02/024") is None
+    assert parse_date("yesterday") is None
+
+def test_amounts_are_parsed_exactly(monkeypatch):
+    monkeypatch.setattr(settings, "default_currency", "USD")
+    assert parse_amount("$1200.00") == (Decimal("1200.00"), "USD")
+    assert parse_amount(" $0.10 ") == (Decimal("0.10"), "USD")
+    assert parse_amount("1200.00") is None
+    assert parse_amount("$12") is None
+
+def test_extracted_amounts_are_all_parseable():
+    pairs = extract_pairs("Subtotal: $1074.08\nTax = $107.41\nTotal Due: $1181.49 on 01/18/2021")
+    assert pairs["extracted_amounts"]
+    assert all(parse_amount(amount) is not None for amount in pairs["extracted_amounts"])
+
+def test_amounts_that_do_not_fit_decimal128_are_skipped():
+    pairs = {"extracted_amounts": ["$" + "9" * 40 + ".00", "$12.50"]}
+    entries = build_typed_fields(pairs, {"extracted_amounts": [1, 2]})
+    assert entries == [{"kind": "amount", "value": Decimal128("12.50"), "currency": "USD", "page": 2}]
+
+def test_out_of_range_amount_filter_is_rejected(monkeypatch):
+    monkeypatch.setattr(database, "db", AsyncMongoMockClient().db)
+    app.dependency_overrides[get_current_user] = lambda: "owner"
+    try:
+        client = TestClient(app)
+        assert client.get("/api/", params={"amount_min": "9" * 40}).status_code == 422
+        assert client.get("/api/", params={"amount_max": "12.50"}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()